@@ -0,0 +1,30 @@
+"""add job_history parent_job_id
+
+Revision ID: 3f1a9c2b7e45
+Revises: d4629e0c0faa
+Create Date: 2025-11-24 10:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2b7e45'
+down_revision: Union[str, Sequence[str], None] = 'd4629e0c0faa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job_history', sa.Column('parent_job_id', sa.String(length=100), nullable=True))
+    op.create_index(op.f('ix_job_history_parent_job_id'), 'job_history', ['parent_job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_history_parent_job_id'), table_name='job_history')
+    op.drop_column('job_history', 'parent_job_id')
@@ -0,0 +1,35 @@
+"""add job retry tracking
+
+Revision ID: 5c7d0e9a2f18
+Revises: 8b2e6d4f1c93
+Create Date: 2025-11-28 14:05:52.310947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7d0e9a2f18'
+down_revision: Union[str, Sequence[str], None] = '8b2e6d4f1c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # New enum values cannot be added inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'RETRYING'")
+    op.add_column('job_history', sa.Column('retry_of', sa.String(length=100), nullable=True))
+    op.create_index(op.f('ix_job_history_retry_of'), 'job_history', ['retry_of'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_history_retry_of'), table_name='job_history')
+    op.drop_column('job_history', 'retry_of')
+    # PostgreSQL cannot drop an enum value; RETRYING rows are folded into FAILED
+    op.execute("UPDATE job_history SET status = 'FAILED' WHERE status = 'RETRYING'")
@@ -0,0 +1,37 @@
+"""add job_history keyset indexes
+
+Revision ID: 6d2f8a1c4b97
+Revises: a91c3e5d7b20
+Create Date: 2025-12-03 09:41:18.226904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f8a1c4b97'
+down_revision: Union[str, Sequence[str], None] = 'a91c3e5d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so a large job_history stays writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index('ix_job_history_created_at_id', 'job_history', ['created_at', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_job_history_status_created_at_id', 'job_history', ['status', 'created_at', 'id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_job_history_status_created_at_id', table_name='job_history',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_job_history_created_at_id', table_name='job_history',
+                      postgresql_concurrently=True)
@@ -0,0 +1,31 @@
+"""add job_history coalesced_requests
+
+Revision ID: 8b2e6d4f1c93
+Revises: 3f1a9c2b7e45
+Create Date: 2025-11-26 09:41:08.772514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e6d4f1c93'
+down_revision: Union[str, Sequence[str], None] = '3f1a9c2b7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'job_history',
+        sa.Column('coalesced_requests', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_history', 'coalesced_requests')
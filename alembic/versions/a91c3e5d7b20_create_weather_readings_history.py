@@ -0,0 +1,62 @@
+"""create weather readings history
+
+Revision ID: a91c3e5d7b20
+Revises: 5c7d0e9a2f18
+Create Date: 2025-12-01 11:22:37.094561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91c3e5d7b20'
+down_revision: Union[str, Sequence[str], None] = '5c7d0e9a2f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(name,
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('temperature_min', sa.Float(), nullable=False),
+    sa.Column('temperature_max', sa.Float(), nullable=False),
+    sa.Column('temperature_mean', sa.Float(), nullable=False),
+    sa.Column('wind_speed_min', sa.Float(), nullable=False),
+    sa.Column('wind_speed_max', sa.Float(), nullable=False),
+    sa.Column('wind_speed_mean', sa.Float(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('city', 'bucket_start')
+    )
+    op.create_index(f'ix_{name}_bucket_start', name, ['bucket_start'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Daily range partitions are created ahead of time by the worker's
+    # history maintenance job (app/service/readings.py).
+    op.create_table('weather_readings',
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('observed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('temperature', sa.Float(), nullable=False),
+    sa.Column('wind_speed', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('city', 'observed_at'),
+    postgresql_partition_by='RANGE (observed_at)'
+    )
+    op.create_index('ix_weather_readings_observed_at', 'weather_readings', ['observed_at'], unique=False)
+    _create_rollup_table('weather_readings_hourly')
+    _create_rollup_table('weather_readings_daily')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('weather_readings_daily')
+    op.drop_table('weather_readings_hourly')
+    # Dropping the partitioned parent drops every partition with it
+    op.drop_index('ix_weather_readings_observed_at', table_name='weather_readings')
+    op.drop_table('weather_readings')
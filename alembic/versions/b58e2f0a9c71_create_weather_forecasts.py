@@ -0,0 +1,40 @@
+"""create weather forecasts
+
+Revision ID: b58e2f0a9c71
+Revises: e3b7c9d15a26
+Create Date: 2025-12-08 16:27:05.381942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b58e2f0a9c71'
+down_revision: Union[str, Sequence[str], None] = 'e3b7c9d15a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('weather_forecasts',
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('interval_seconds', sa.Integer(), nullable=False),
+    sa.Column('hours', sa.Integer(), nullable=False),
+    sa.Column('variables', postgresql.ARRAY(sa.String(length=50)), nullable=False),
+    sa.Column('values', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('city')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('weather_forecasts')
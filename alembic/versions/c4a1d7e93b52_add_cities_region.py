@@ -0,0 +1,40 @@
+"""add cities region
+
+Revision ID: c4a1d7e93b52
+Revises: b58e2f0a9c71
+Create Date: 2025-12-10 10:48:33.902716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a1d7e93b52'
+down_revision: Union[str, Sequence[str], None] = 'b58e2f0a9c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_REGIONS = {
+    'London': 'Europe',
+    'New York': 'North America',
+    'Tokyo': 'Asia',
+    'Cairo': 'Africa',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cities', sa.Column('region', sa.String(length=100), nullable=True))
+    op.create_index(op.f('ix_cities_region'), 'cities', ['region'], unique=False)
+    cities = sa.table('cities', sa.column('name', sa.String), sa.column('region', sa.String))
+    for name, region in DEFAULT_REGIONS.items():
+        op.execute(cities.update().where(cities.c.name == name).values(region=region))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cities_region'), table_name='cities')
+    op.drop_column('cities', 'region')
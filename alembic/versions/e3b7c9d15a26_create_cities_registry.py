@@ -0,0 +1,49 @@
+"""create cities registry
+
+Revision ID: e3b7c9d15a26
+Revises: 6d2f8a1c4b97
+Create Date: 2025-12-05 14:03:52.617430
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b7c9d15a26'
+down_revision: Union[str, Sequence[str], None] = '6d2f8a1c4b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Previously hard-coded in Settings.CITIES
+DEFAULT_CITIES = [
+    {'name': 'London', 'latitude': 51.5072, 'longitude': -0.1276},
+    {'name': 'New York', 'latitude': 40.7128, 'longitude': -74.0060},
+    {'name': 'Tokyo', 'latitude': 35.6762, 'longitude': 139.6503},
+    {'name': 'Cairo', 'latitude': 30.0444, 'longitude': 31.2357},
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    cities = op.create_table('cities',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cities_id'), 'cities', ['id'], unique=False)
+    op.create_index(op.f('ix_cities_name'), 'cities', ['name'], unique=True)
+    op.bulk_insert(cities, DEFAULT_CITIES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cities_name'), table_name='cities')
+    op.drop_index(op.f('ix_cities_id'), table_name='cities')
+    op.drop_table('cities')
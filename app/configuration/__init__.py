@@ -1,3 +1,3 @@
-from .config import Settings, get_settings
+from .config import DbPoolSettings, Settings, get_settings
 
-__all__ = ["get_settings", "Settings"]
+__all__ = ["get_settings", "Settings", "DbPoolSettings"]
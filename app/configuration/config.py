@@ -1,10 +1,29 @@
+import os
 from functools import lru_cache
-from typing import Dict
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class DbPoolSettings(BaseModel):
+    """SQLAlchemy connection pool options for one process role."""
+
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=10, ge=0)
+    pool_recycle: int = Field(default=1800, description="Seconds before a connection is replaced")
+    pool_pre_ping: bool = True
+    pool_timeout: float = Field(default=30.0, gt=0)
+
+
+# Per-role defaults; DB_POOL overrides are merged onto these field by field
+DEFAULT_DB_POOL: Dict[str, Dict[str, Any]] = {
+    "api": {"pool_size": 10, "max_overflow": 20},
+    "worker": {"pool_size": 2, "max_overflow": 3},
+    "producer": {"pool_size": 1, "max_overflow": 1},
+}
+
+
 class Settings(BaseSettings):
     """Central application configuration loaded from environment variables."""
 
@@ -18,29 +37,255 @@ class Settings(BaseSettings):
     API_HOST: str = Field(default="0.0.0.0")
     API_PORT: int = Field(default=8000)
     ALLOWED_ORIGINS: str = Field(default="*")
+    SSE_KEEPALIVE_SECONDS: float = Field(
+        default=15.0,
+        gt=0,
+        description="Idle interval after which live streams send a keep-alive comment",
+    )
+    SSE_CLIENT_QUEUE_SIZE: int = Field(
+        default=100,
+        ge=1,
+        description="Updates buffered per live-stream client before the oldest is dropped",
+    )
 
     # Data stores
     DATABASE_URL: str = Field(..., description="SQLAlchemy connection string")
+    ASYNC_DATABASE_URL: Optional[str] = Field(
+        default=None,
+        description="Async SQLAlchemy URL; derived from DATABASE_URL (asyncpg) when unset",
+    )
     REDIS_URL: str = Field(..., description="Redis connection URL")
+    REDIS_MAX_CONNECTIONS: int = Field(default=50, ge=1, le=10000)
+    REDIS_POOL_TIMEOUT_SECONDS: float = Field(
+        default=5.0,
+        gt=0,
+        description="How long to wait for a free pooled connection",
+    )
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = Field(default=5.0, gt=0)
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0, gt=0)
+    PROCESS_ROLE: Literal["api", "worker", "producer"] = Field(
+        default="api",
+        description="Selects this process's entry in DB_POOL",
+    )
+    DB_POOL: Dict[str, DbPoolSettings] = Field(
+        default_factory=lambda: {
+            role: DbPoolSettings(**options) for role, options in DEFAULT_DB_POOL.items()
+        },
+        description="Pool options per role; overrides only replace the fields they set",
+    )
+    DB_UPSERT_CHUNK_SIZE: int = Field(
+        default=1000,
+        ge=1,
+        le=10000,
+        description="Rows per multi-row upsert statement",
+    )
 
     # External APIs
     WEATHER_API_URL: str = Field(
         default="https://api.open-meteo.com/v1/forecast",
         description="Base URL for Open-Meteo API",
     )
+    WEATHER_BATCH_SIZE: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Locations sent per Open-Meteo request (1 disables batching)",
+    )
+    WEATHER_FETCH_MODE: Literal["sync", "async"] = Field(
+        default="sync",
+        description="Worker fetch engine: blocking client or asyncio engine",
+    )
+    WEATHER_MAX_CONCURRENCY: int = Field(
+        default=10,
+        ge=1,
+        le=200,
+        description="Maximum in-flight Open-Meteo requests for the async engine",
+    )
+    WEATHER_REQUEST_TIMEOUT_SECONDS: float = Field(default=10.0, gt=0, le=120)
+    WEATHER_HTTP_RETRIES: int = Field(
+        default=1,
+        ge=0,
+        le=10,
+        description="Immediate per-request retries; longer outages go to delayed retry jobs",
+    )
+    WEATHER_RATE_LIMIT_PER_SECOND: float = Field(
+        default=8.0,
+        ge=0,
+        description="Fleet-wide Open-Meteo request rate shared via Redis (0 disables)",
+    )
+    WEATHER_RATE_LIMIT_BURST: int = Field(default=20, ge=1)
+    WEATHER_BREAKER_FAILURE_THRESHOLD: int = Field(
+        default=5,
+        ge=1,
+        description="Upstream failures within the window that open the circuit",
+    )
+    WEATHER_BREAKER_WINDOW_SECONDS: int = Field(default=60, ge=1)
+    WEATHER_BREAKER_COOLDOWN_SECONDS: int = Field(default=60, ge=1)
+    WEATHER_GRID_DEDUP: bool = Field(
+        default=True,
+        description="Fetch each learned model grid cell once per job",
+    )
+    WEATHER_CACHE_BACKEND: Literal["sqlite", "redis", "none"] = Field(
+        default="sqlite",
+        description="HTTP response cache: per-container SQLite file or shared Redis",
+    )
 
     # Background processing
     SCHEDULER_INTERVAL_SECONDS: int = Field(default=60, ge=15, le=3600)
+    SCHEDULER_MODE: Literal["interval", "freshness"] = Field(
+        default="interval",
+        description="interval: every city each tick; freshness: only cities that are due",
+    )
+    WEATHER_REFRESH_SECONDS: int = Field(
+        default=900,
+        ge=60,
+        description="Upstream refresh cadence; a city is due again this long after a fetch",
+    )
+    SCHEDULER_JITTER_SECONDS: int = Field(
+        default=120,
+        ge=0,
+        description="Random spread added to each city's next due time",
+    )
+    WORKER_MODE: Literal["fork", "warm"] = Field(
+        default="fork",
+        description="fork: RQ work-horse per job; warm: run jobs in a long-lived process",
+    )
+    WORKER_RECYCLE_AFTER_JOBS: int = Field(
+        default=500,
+        ge=1,
+        description="Warm worker rebuilds its clients and pools after this many jobs",
+    )
+    SUPERVISOR_MIN_WORKERS: int = Field(default=1, ge=0)
+    SUPERVISOR_MAX_WORKERS: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        ge=1,
+        description="Upper bound for worker processes (defaults to the core count)",
+    )
+    SUPERVISOR_JOBS_PER_WORKER: int = Field(
+        default=5,
+        ge=1,
+        description="Queued jobs per worker before the pool grows",
+    )
+    SUPERVISOR_MAX_JOB_AGE_SECONDS: int = Field(
+        default=30,
+        ge=1,
+        description="Grow the pool when the oldest queued job has waited this long",
+    )
+    SUPERVISOR_POLL_SECONDS: float = Field(default=5.0, gt=0)
+    SUPERVISOR_SCALE_DOWN_DELAY_SECONDS: int = Field(
+        default=60,
+        ge=0,
+        description="How long demand must stay low before a worker is drained",
+    )
+    SUPERVISOR_SHUTDOWN_GRACE_SECONDS: int = Field(
+        default=330,
+        ge=1,
+        description="Time draining workers get to finish their job before SIGKILL",
+    )
+    JOB_COALESCING: bool = Field(
+        default=True,
+        description="Skip cities already pending or in flight in another job",
+    )
+    JOB_COALESCE_TTL_SECONDS: int = Field(
+        default=900,
+        ge=60,
+        description="Upper bound on how long a city stays claimed by one job",
+    )
+    JOB_MAX_RETRIES: int = Field(
+        default=3,
+        ge=0,
+        description="Delayed retry jobs allowed for a job's failed cities",
+    )
+    JOB_RETRY_BASE_DELAY_SECONDS: float = Field(
+        default=10.0,
+        gt=0,
+        description="First retry delay; doubles per attempt, plus random jitter",
+    )
+    JOB_SHARD_SIZE: int = Field(
+        default=500,
+        ge=1,
+        description="Cities per shard job; larger runs fan out across workers",
+    )
 
-    # City metadata
-    CITIES: Dict[str, Dict[str, float]] = Field(
-        default_factory=lambda: {
-            "London": {"latitude": 51.5072, "longitude": -0.1276},
-            "New York": {"latitude": 40.7128, "longitude": -74.0060},
-            "Tokyo": {"latitude": 35.6762, "longitude": 139.6503},
-            "Cairo": {"latitude": 30.0444, "longitude": 31.2357},
-        }
+    # Readings history
+    READINGS_RETENTION_DAYS: int = Field(
+        default=30,
+        ge=1,
+        description="Days of raw readings kept; older daily partitions are dropped",
+    )
+    READINGS_PARTITIONS_AHEAD_DAYS: int = Field(
+        default=3,
+        ge=0,
+        description="Daily partitions created ahead of today by maintenance",
     )
+    READINGS_ROLLUP_LOOKBACK_HOURS: int = Field(
+        default=3,
+        ge=1,
+        description="Hours of recent readings re-aggregated on each rollup",
+    )
+    HISTORY_MAINTENANCE_INTERVAL_SECONDS: int = Field(
+        default=300,
+        ge=10,
+        description="How often the scheduler enqueues rollup/retention maintenance",
+    )
+
+    # Aggregate stats
+    STATS_ALIGN_SECONDS: int = Field(
+        default=60,
+        ge=1,
+        description="Open-ended stats windows are floored to this so requests share cache entries",
+    )
+    STATS_CACHE_TTL_SECONDS: int = Field(default=60, ge=1)
+    STATS_CLOSED_WINDOW_TTL_SECONDS: int = Field(
+        default=86400,
+        ge=1,
+        description="Cache lifetime for windows that ended before the last refresh",
+    )
+
+    # Hourly forecasts
+    FORECAST_HOURLY_VARIABLES: List[str] = Field(
+        default_factory=lambda: [
+            "temperature_2m",
+            "relative_humidity_2m",
+            "precipitation",
+            "wind_speed_10m",
+        ],
+        description="Open-Meteo hourly variables ingested for /api/forecast",
+    )
+    FORECAST_DAYS: int = Field(default=7, ge=1, le=16)
+    FORECAST_REFRESH_SECONDS: int = Field(
+        default=3600,
+        ge=300,
+        description="How often the scheduler enqueues forecast ingestion",
+    )
+
+    # Bulk export
+    EXPORT_BATCH_ROWS: int = Field(
+        default=10000,
+        ge=100,
+        le=100000,
+        description="Rows fetched from the server-side cursor and encoded per chunk",
+    )
+
+    @field_validator("DB_POOL", mode="before")
+    @classmethod
+    def _merge_db_pool_defaults(cls, value: Any) -> Any:
+        """Keep the roles and fields an override leaves out at their defaults."""
+        if not isinstance(value, dict):
+            return value
+        merged: Dict[str, Any] = {role: dict(options) for role, options in DEFAULT_DB_POOL.items()}
+        for role, options in value.items():
+            if isinstance(options, DbPoolSettings):
+                options = options.model_dump(exclude_unset=True)
+            if isinstance(options, dict):
+                merged[role] = {**merged.get(role, {}), **options}
+            else:
+                merged[role] = options
+        return merged
+
+    def db_pool_settings(self, role: Optional[str] = None) -> DbPoolSettings:
+        """Pool options for ``role`` (defaults to PROCESS_ROLE)."""
+        return self.DB_POOL.get(role or self.PROCESS_ROLE, DbPoolSettings())
 
 
 @lru_cache
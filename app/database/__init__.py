@@ -1,3 +1,27 @@
-from .db_config import Base, engine, SessionLocal, get_db
+from .db_config import (
+    AsyncSessionLocal,
+    Base,
+    SessionLocal,
+    async_engine,
+    create_db_engine,
+    engine,
+    get_async_db,
+    get_db,
+    get_pool_stats,
+)
+from .redis_config import close_redis_pool, get_redis, init_redis_pool
 
-__all__ = ["Base", "engine", "SessionLocal", "get_db"]
+__all__ = [
+    "Base",
+    "engine",
+    "SessionLocal",
+    "get_db",
+    "async_engine",
+    "AsyncSessionLocal",
+    "get_async_db",
+    "create_db_engine",
+    "get_pool_stats",
+    "get_redis",
+    "init_redis_pool",
+    "close_redis_pool",
+]
@@ -1,14 +1,76 @@
+import logging
+import os
+from typing import Dict, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from app.configuration import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL, future=True)
+
+def to_async_url(url: str) -> str:
+    """Swap the sync PostgreSQL driver in ``url`` for asyncpg."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def pool_options(role: Optional[str] = None) -> Dict[str, object]:
+    """Engine keyword arguments for the pool of ``role`` (PROCESS_ROLE by default)."""
+    return settings.db_pool_settings(role).model_dump()
+
+
+def make_fork_safe(sync_engine: Engine) -> Engine:
+    """
+    Make ``sync_engine`` safe to use in processes forked after its creation.
+
+    A forked child (e.g. an RQ work-horse) inherits the parent's pooled
+    sockets; using them from both processes corrupts the protocol stream.
+    The child therefore drops the inherited pool without closing the
+    parent's connections and opens its own on first use.
+    """
+    os.register_at_fork(after_in_child=lambda: sync_engine.dispose(close=False))
+    return sync_engine
+
+
+def create_db_engine(url: Optional[str] = None, role: Optional[str] = None) -> Engine:
+    """Create a fork-safe engine sized for this process role."""
+    return make_fork_safe(
+        create_engine(url or settings.DATABASE_URL, future=True, **pool_options(role))
+    )
+
+
+def get_pool_stats(sync_engine: Engine) -> Dict[str, object]:
+    """Live checkout/overflow figures for an engine's connection pool."""
+    pool = sync_engine.pool
+    stats: Dict[str, object] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, name, None)
+        if callable(reader):
+            stats[name] = reader()
+    return stats
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for request handlers, so queries never block the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL),
+    **pool_options(),
+)
+make_fork_safe(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db():
     """Provide a transactional scope around a series of operations."""
@@ -17,3 +79,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Provide an async session for non-blocking reads in FastAPI handlers."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,42 @@
+import logging
+from typing import Optional
+
+from redis import BlockingConnectionPool, Redis
+
+from app.configuration import get_settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[BlockingConnectionPool] = None
+
+
+def init_redis_pool() -> BlockingConnectionPool:
+    """Create the process-wide Redis connection pool (idempotent)."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+            health_check_interval=30,
+        )
+        logger.info(
+            "Redis pool ready (max %s connections)", settings.REDIS_MAX_CONNECTIONS
+        )
+    return _pool
+
+
+def get_redis() -> Redis:
+    """Return a Redis client backed by the shared connection pool."""
+    return Redis(connection_pool=init_redis_pool())
+
+
+def close_redis_pool() -> None:
+    """Disconnect every pooled connection; used at process shutdown."""
+    global _pool
+    if _pool is not None:
+        _pool.disconnect()
+        _pool = None
@@ -1,3 +1,23 @@
-from .sql_models import JobHistory, JobStatus, JobTrigger, WeatherData
+from .sql_models import (
+    City,
+    JobHistory,
+    JobStatus,
+    JobTrigger,
+    WeatherData,
+    WeatherForecast,
+    WeatherReading,
+    WeatherRollupDaily,
+    WeatherRollupHourly,
+)
 
-__all__ = ["JobHistory", "JobStatus", "JobTrigger", "WeatherData"]
+__all__ = [
+    "City",
+    "JobHistory",
+    "JobStatus",
+    "JobTrigger",
+    "WeatherData",
+    "WeatherForecast",
+    "WeatherReading",
+    "WeatherRollupDaily",
+    "WeatherRollupHourly",
+]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Index, LargeBinary, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from app.database.db_config import Base
 import enum
@@ -9,6 +10,7 @@ class JobStatus(str, enum.Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    RETRYING = "retrying"  # failed cities were handed to a delayed retry job
 
 
 class JobTrigger(str, enum.Enum):
@@ -16,6 +18,20 @@ class JobTrigger(str, enum.Enum):
     SCHEDULED = "scheduled"
 
 
+class City(Base):
+    """Registry of locations the pipeline fetches weather for."""
+    __tablename__ = "cities"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    # Free-form grouping for aggregate queries (e.g. "Europe")
+    region = Column(String(100), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class WeatherData(Base):
     __tablename__ = "weather_data"
     
@@ -30,6 +46,11 @@ class WeatherData(Base):
 
 class JobHistory(Base):
     __tablename__ = "job_history"
+    __table_args__ = (
+        # Keyset pagination: newest first, optionally filtered by status
+        Index("ix_job_history_created_at_id", "created_at", "id"),
+        Index("ix_job_history_status_created_at_id", "status", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String(100), unique=True, nullable=False, index=True)
@@ -37,4 +58,62 @@ class JobHistory(Base):
     trigger = Column(Enum(JobTrigger), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    error_message = Column(String(500), nullable=True)
\ No newline at end of file
+    error_message = Column(String(500), nullable=True)
+    # Shard jobs point at the run they belong to; the run row aggregates them
+    parent_job_id = Column(String(100), nullable=True, index=True)
+    # Later requests that attached to this job instead of enqueuing duplicates
+    coalesced_requests = Column(Integer, nullable=False, default=0, server_default="0")
+    # Delayed retry jobs point at the job whose failed cities they re-fetch
+    retry_of = Column(String(100), nullable=True, index=True)
+
+
+class WeatherReading(Base):
+    """Append-only history of every observation, range-partitioned by day."""
+    __tablename__ = "weather_readings"
+    __table_args__ = (
+        PrimaryKeyConstraint("city", "observed_at"),
+        {"postgresql_partition_by": "RANGE (observed_at)"},
+    )
+    
+    city = Column(String(100), nullable=False)
+    observed_at = Column(DateTime(timezone=True), nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    temperature = Column(Float, nullable=False)  # Celsius
+    wind_speed = Column(Float, nullable=False)   # km/h
+
+
+class _WeatherRollupMixin:
+    city = Column(String(100), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    temperature_min = Column(Float, nullable=False)
+    temperature_max = Column(Float, nullable=False)
+    temperature_mean = Column(Float, nullable=False)
+    wind_speed_min = Column(Float, nullable=False)
+    wind_speed_max = Column(Float, nullable=False)
+    wind_speed_mean = Column(Float, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+
+
+class WeatherRollupHourly(_WeatherRollupMixin, Base):
+    __tablename__ = "weather_readings_hourly"
+
+
+class WeatherRollupDaily(_WeatherRollupMixin, Base):
+    __tablename__ = "weather_readings_daily"
+
+
+class WeatherForecast(Base):
+    """Latest hourly forecast per city, stored as one float32 matrix."""
+    __tablename__ = "weather_forecasts"
+    
+    city = Column(String(100), primary_key=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    interval_seconds = Column(Integer, nullable=False)
+    hours = Column(Integer, nullable=False)
+    variables = Column(ARRAY(String(50)), nullable=False)
+    # Little-endian float32, shape (len(variables), hours), row-major
+    values = Column(LargeBinary, nullable=False)
@@ -0,0 +1,71 @@
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from redis import Redis
+
+from app.configuration import get_settings
+
+logger = logging.getLogger(__name__)
+
+DUE_KEY = "weather:schedule:due"
+
+
+def sync_schedule(redis_conn: Redis, cities: Dict[str, Dict[str, float]]) -> int:
+    """
+    Align the due-time sorted set with the configured cities.
+
+    New cities become due at a random point within the jitter window so a
+    large batch of additions does not land in a single tick; removed cities
+    are dropped. Existing due times are left untouched.
+
+    Returns:
+        Number of newly scheduled cities
+    """
+    settings = get_settings()
+    now = time.time()
+    scheduled = {
+        name.decode() if isinstance(name, bytes) else name
+        for name in redis_conn.zrange(DUE_KEY, 0, -1)
+    }
+
+    with redis_conn.pipeline() as pipe:
+        stale = scheduled - cities.keys()
+        if stale:
+            pipe.zrem(DUE_KEY, *stale)
+        new_entries = {
+            city: now + random.uniform(0, settings.SCHEDULER_JITTER_SECONDS)
+            for city in cities.keys() - scheduled
+        }
+        if new_entries:
+            pipe.zadd(DUE_KEY, new_entries, nx=True)
+        pipe.execute()
+
+    return len(new_entries)
+
+
+def claim_due_cities(redis_conn: Redis, now: Optional[float] = None) -> List[str]:
+    """
+    Return the cities that are due and push their next due time forward.
+
+    The next due time is ``WEATHER_REFRESH_SECONDS`` plus a random jitter,
+    so cities that started together drift apart over successive cycles.
+    """
+    settings = get_settings()
+    now = now if now is not None else time.time()
+    due = [
+        name.decode() if isinstance(name, bytes) else name
+        for name in redis_conn.zrangebyscore(DUE_KEY, "-inf", now)
+    ]
+    if not due:
+        return []
+
+    next_due = {
+        city: now
+        + settings.WEATHER_REFRESH_SECONDS
+        + random.uniform(0, settings.SCHEDULER_JITTER_SECONDS)
+        for city in due
+    }
+    redis_conn.zadd(DUE_KEY, next_due, xx=True)
+    return due
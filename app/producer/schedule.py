@@ -4,12 +4,18 @@ from datetime import datetime
 from typing import Dict
 
 from redis import Redis
-from rq import Queue
 from sqlalchemy.orm import Session
 
 from app.configuration import get_settings
-from app.database import SessionLocal
-from app.models import JobHistory, JobStatus, JobTrigger
+from app.database import SessionLocal, close_redis_pool, get_redis
+from app.models import JobTrigger
+from app.producer.freshness import DUE_KEY, claim_due_cities, sync_schedule
+from app.service.city_registry import load_city_configs
+from app.service.job_service import (
+    enqueue_forecast_jobs,
+    enqueue_history_maintenance,
+    enqueue_weather_job,
+)
 
 
 logging.basicConfig(
@@ -20,38 +26,30 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-QUEUE_NAME = "weather-jobs"
-JOB_TIMEOUT = "5m"
-
 
-def create_scheduled_job(queue: Queue, db_session: Session):
+def create_scheduled_job(redis_conn: Redis, db_session: Session):
     """
-    Create a scheduled job to fetch weather data for all standard cities.
+    Create a scheduled job to fetch weather data for all registry cities.
     """
     try:
         # Get all cities configuration
-        cities_to_fetch: Dict[str, Dict[str, float]] = settings.CITIES.copy()
+        cities_to_fetch: Dict[str, Dict[str, float]] = load_city_configs(db_session)
+        if not cities_to_fetch:
+            logger.info("City registry is empty; nothing to schedule")
+            return None
         
-        logger.info(f"Creating scheduled job for cities: {list(cities_to_fetch.keys())}")
+        logger.info(f"Creating scheduled job for {len(cities_to_fetch)} cities")
         
-        # Enqueue job
-        job = queue.enqueue(
-            "app.worker.rq_worker.fetch_and_store_weather",
-            cities_to_fetch,
-            job_timeout=JOB_TIMEOUT,
+        # Record and enqueue job (cities still in flight are coalesced)
+        result = enqueue_weather_job(
+            db_session, cities_to_fetch, JobTrigger.SCHEDULED, redis_conn
         )
         
-        # Create job history record
-        job_history = JobHistory(
-            job_id=job.id,
-            status=JobStatus.PENDING,
-            trigger=JobTrigger.SCHEDULED
-        )
-        db_session.add(job_history)
-        db_session.commit()
-        
-        logger.info(f"✓ Scheduled job created: {job.id}")
-        return job.id
+        if not result["enqueued"]:
+            logger.info(f"Workers still busy; attached to in-flight job {result['job_id']}")
+        else:
+            logger.info(f"✓ Scheduled job created: {result['job_id']}")
+        return result["job_id"]
         
     except Exception as e:
         logger.error(f"✗ Error creating scheduled job: {str(e)}", exc_info=True)
@@ -59,6 +57,49 @@ def create_scheduled_job(queue: Queue, db_session: Session):
         return None
 
 
+def create_freshness_job(redis_conn: Redis, db_session: Session):
+    """
+    Create a scheduled job for the cities whose data is due for a refresh.
+    Returns None when no city is due this tick.
+    """
+    due_cities = []
+    try:
+        registry = load_city_configs(db_session)
+        db_session.commit()  # end the read transaction so the next tick sees new cities
+        sync_schedule(redis_conn, registry)
+        due_cities = claim_due_cities(redis_conn)
+        if not due_cities:
+            logger.info("No cities due for refresh")
+            return None
+        
+        cities_to_fetch: Dict[str, Dict[str, float]] = {
+            city: registry[city] for city in due_cities if city in registry
+        }
+        if not cities_to_fetch:
+            # Every due city was removed from the registry since the claim
+            logger.info("No registry cities due for refresh")
+            return None
+        logger.info(f"Creating freshness job for {len(cities_to_fetch)} due cities")
+        
+        job_id = enqueue_weather_job(
+            db_session, cities_to_fetch, JobTrigger.SCHEDULED, redis_conn
+        )["job_id"]
+        
+        logger.info(f"✓ Freshness job created: {job_id}")
+        return job_id
+        
+    except Exception as e:
+        logger.error(f"✗ Error creating freshness job: {str(e)}", exc_info=True)
+        db_session.rollback()
+        if due_cities:
+            # Make the claimed cities due again so the next tick picks them up
+            try:
+                redis_conn.zadd(DUE_KEY, {city: time.time() for city in due_cities}, xx=True)
+            except Exception:
+                logger.warning("Could not reschedule %s claimed cities", len(due_cities))
+        return None
+
+
 def main():
     """
     Main scheduler loop.
@@ -66,13 +107,11 @@ def main():
     """
     interval = settings.SCHEDULER_INTERVAL_SECONDS
     logger.info("Starting Weather Job Scheduler...")
-    logger.info("Schedule: every %s seconds", interval)
-    logger.info(f"Cities: {', '.join(settings.CITIES.keys())}")
+    logger.info("Schedule: every %s seconds (%s mode)", interval, settings.SCHEDULER_MODE)
     logger.info(f"Connecting to Redis: {settings.REDIS_URL.split('@')[-1]}")
     
-    # Connect to Redis
-    redis_conn = Redis.from_url(settings.REDIS_URL)
-    queue = Queue(name=QUEUE_NAME, connection=redis_conn)
+    # Connect to Redis (shared connection pool)
+    redis_conn = get_redis()
     
     # Database session
     db = SessionLocal()
@@ -85,8 +124,31 @@ def main():
             
             logger.info(f"[{current_time}] Scheduler iteration #{iteration}")
             
+            # Readings rollups and retention (gated to one run per interval)
+            try:
+                if enqueue_history_maintenance(redis_conn):
+                    logger.info("History maintenance job enqueued")
+            except Exception as e:
+                logger.error(f"✗ Error enqueuing history maintenance: {str(e)}")
+            
+            # Hourly forecasts (gated to one refresh per FORECAST_REFRESH_SECONDS)
+            try:
+                forecast_shards = enqueue_forecast_jobs(lambda: load_city_configs(db), redis_conn)
+                db.commit()
+                if forecast_shards:
+                    logger.info(f"Forecast refresh enqueued in {forecast_shards} jobs")
+            except Exception as e:
+                db.rollback()
+                logger.error(f"✗ Error enqueuing forecast refresh: {str(e)}")
+            
             # Create scheduled job
-            job_id = create_scheduled_job(queue, db)
+            if settings.SCHEDULER_MODE == "freshness":
+                job_id = create_freshness_job(redis_conn, db)
+                if not job_id:
+                    time.sleep(interval)
+                    continue
+            else:
+                job_id = create_scheduled_job(redis_conn, db)
             
             if job_id:
                 logger.info("Next job scheduled in %s seconds...", interval)
@@ -102,6 +164,7 @@ def main():
         logger.error(f"Scheduler error: {str(e)}", exc_info=True)
     finally:
         db.close()
+        close_redis_pool()
         logger.info("Scheduler shut down")
 
 
@@ -0,0 +1,137 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import logging
+
+from app.database import get_async_db, get_redis
+from app.models import City, WeatherData
+from app.schema import CityConfig, CityResponse, CityUpdate
+from app.service.city_registry import get_city, get_city_index_sync, publish_city_change
+from app.service.http_cache import WEATHER_RESOURCE, bump_resource_version
+from app.service.weather_snapshot import invalidate_weather_snapshot
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+async def _apply_change(city: Optional[City], name: str) -> None:
+    """Update this process's index now; other processes follow via Redis."""
+    index = get_city_index_sync().index
+    if city is None:
+        index.remove(name)
+    else:
+        index.upsert(name, city.latitude, city.longitude)
+    await asyncio.to_thread(publish_city_change, get_redis(), city, name)
+
+
+async def _invalidate_weather() -> None:
+    """Make /api/weather drop a removed or stale ``weather_data`` row."""
+    await asyncio.to_thread(_invalidate_weather_sync, get_redis())
+
+
+def _invalidate_weather_sync(redis_conn) -> None:
+    try:
+        invalidate_weather_snapshot(redis_conn)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate weather snapshot: {str(e)}")
+    bump_resource_version(redis_conn, WEATHER_RESOURCE)
+
+
+@router.get("/cities", response_model=List[CityResponse])
+async def list_cities(
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=1000),
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List registry cities by name.
+    Pass the ``X-Next-Cursor`` response header back as ``after`` for the next page.
+    """
+    try:
+        query = select(City).order_by(City.name).limit(limit + 1)
+        if after:
+            query = query.where(City.name > after)
+        cities = list(await db.scalars(query))
+
+        if len(cities) > limit:
+            cities = cities[:limit]
+            response.headers["X-Next-Cursor"] = cities[-1].name
+        return [CityResponse.model_validate(city) for city in cities]
+
+    except Exception as e:
+        logger.error(f"Error listing cities: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list cities: {str(e)}")
+
+
+@router.get("/cities/{name}", response_model=CityResponse)
+async def read_city(name: str, db: AsyncSession = Depends(get_async_db)):
+    city = await get_city(db, name)
+    if city is None:
+        raise HTTPException(status_code=404, detail=f"City {name!r} not found")
+    return CityResponse.model_validate(city)
+
+
+@router.post("/cities", response_model=CityResponse, status_code=201)
+async def create_city(city_data: CityConfig, db: AsyncSession = Depends(get_async_db)):
+    """Add a city to the registry; the scheduler picks it up on its next tick."""
+    city = City(**city_data.model_dump())
+    db.add(city)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"City {city_data.name!r} already exists")
+    await db.refresh(city)
+
+    await _apply_change(city, city.name)
+    logger.info(f"Registered city {city.name}")
+    return CityResponse.model_validate(city)
+
+
+@router.put("/cities/{name}", response_model=CityResponse)
+async def update_city(
+    name: str,
+    city_data: CityUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Move or regroup a city; its next fetch uses the new coordinates.
+    A move drops the current reading, which belongs to the old location.
+    """
+    city = await get_city(db, name)
+    if city is None:
+        raise HTTPException(status_code=404, detail=f"City {name!r} not found")
+    moved = (city.latitude, city.longitude) != (city_data.latitude, city_data.longitude)
+    city.latitude = city_data.latitude
+    city.longitude = city_data.longitude
+    city.region = city_data.region
+    if moved:
+        await db.execute(delete(WeatherData).where(WeatherData.city == name))
+    await db.commit()
+    await db.refresh(city)
+
+    await _apply_change(city, name)
+    if moved:
+        await _invalidate_weather()
+    return CityResponse.model_validate(city)
+
+
+@router.delete("/cities/{name}", status_code=204)
+async def delete_city(name: str, db: AsyncSession = Depends(get_async_db)):
+    """Remove a city and its current reading (history is kept)."""
+    city = await get_city(db, name)
+    if city is None:
+        raise HTTPException(status_code=404, detail=f"City {name!r} not found")
+    await db.delete(city)
+    await db.execute(delete(WeatherData).where(WeatherData.city == name))
+    await db.commit()
+
+    await _apply_change(None, name)
+    await _invalidate_weather()
+    logger.info(f"Removed city {name}")
+    return Response(status_code=204)
@@ -4,26 +4,22 @@ from typing import List
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.configuration import get_settings
-from app.database import get_db
-from app.models import JobHistory, WeatherData
+from app.database import get_async_db
+from app.models import City, WeatherData
+from app.service.job_history import job_history_page_query, split_page
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
-settings = get_settings()
 
 
 @router.get("/", response_class=HTMLResponse)
-async def dashboard_page(request: Request, db: Session = Depends(get_db)):
+async def dashboard_page(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Render the dashboard with manual trigger button and job history."""
-    jobs: List[JobHistory] = (
-        db.query(JobHistory)
-        .order_by(JobHistory.created_at.desc())
-        .limit(20)
-        .all()
+    jobs, _ = split_page(
+        (await db.execute(job_history_page_query(limit=20))).all(), 20
     )
 
     return templates.TemplateResponse(
@@ -36,16 +32,19 @@ async def dashboard_page(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/weather", response_class=HTMLResponse)
-async def weather_page(request: Request, db: Session = Depends(get_db)):
-    """Render the weather data table for the standard cities."""
-    weather_records: List[WeatherData] = (
-        db.query(WeatherData)
-        .order_by(WeatherData.city.asc())
-        .all()
+async def weather_page(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Render the weather data table for the registry cities."""
+    city_names: List[str] = list(
+        await db.scalars(select(City.name).order_by(City.name.asc()))
+    )
+    weather_records: List[WeatherData] = list(
+        await db.scalars(
+            select(WeatherData).order_by(WeatherData.city.asc())
+        )
+    )
+    last_sync: datetime | None = await db.scalar(
+        select(func.max(WeatherData.last_updated))
     )
-    last_sync: datetime | None = db.query(
-        func.max(WeatherData.last_updated)
-    ).scalar()
 
     data_by_city = {record.city: record for record in weather_records}
     ordered_cities = [
@@ -53,7 +52,7 @@ async def weather_page(request: Request, db: Session = Depends(get_db)):
             "name": city,
             "record": data_by_city.get(city),
         }
-        for city in settings.CITIES.keys()
+        for city in city_names
     ]
 
     return templates.TemplateResponse(
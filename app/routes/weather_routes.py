@@ -1,20 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from redis import Redis
-from rq import Queue
-from typing import List
+from typing import List, Optional
 import logging
 
-from app.database import get_db
+from app.database import async_engine, engine, get_async_db, get_db, get_pool_stats, get_redis
 from app.configuration import get_settings
-from app.models import WeatherData, JobHistory, JobStatus, JobTrigger
+from app.models import JobStatus, JobTrigger, WeatherForecast
 from app.schema import (
     JobCreate, 
     JobResponse, 
     WeatherListResponse, 
-    WeatherDataResponse,
-    JobHistoryResponse
+    JobHistoryResponse,
+    NearestCityResponse,
+)
+from app.service.city_registry import get_city_index_sync, load_city_configs
+from app.service.export_service import (
+    MEDIA_TYPES,
+    ExportDataset,
+    ExportError,
+    ExportFormat,
+    stream_export,
+)
+from app.service.forecast_service import serialize_forecast
+from app.service.http_cache import (
+    JOBS_RESOURCE,
+    WEATHER_RESOURCE,
+    ensure_resource_version,
+    is_not_modified,
+    version_headers,
+)
+from app.service.job_history import (
+    InvalidCursorError,
+    decode_job_cursor,
+    job_history_page_query,
+    serialize_job_page,
+    split_page,
+)
+from app.service.job_service import enqueue_weather_job
+from app.service.live_updates import get_broadcaster
+from app.service.metrics import get_metrics
+from app.service.rate_limiter import get_circuit_breaker
+from app.service.weather_stats import (
+    GroupBy,
+    StatsRequestError,
+    compute_weather_stats,
+    get_cached_stats,
+    resolve_window,
+    set_cached_stats,
+    stats_cache_key,
+    stats_cache_ttl,
+    validate_metrics,
+)
+from app.service.weather_snapshot import (
+    build_weather_snapshot_async,
+    get_weather_snapshot,
+    publish_weather_snapshot,
 )
 
 logger = logging.getLogger(__name__)
@@ -22,33 +68,19 @@ router = APIRouter()
 settings = get_settings()
 
 
-QUEUE_NAME = "weather-jobs"
-JOB_TIMEOUT = "5m"
-
-def get_redis_queue():
-    """Get Redis Queue instance"""
-    redis_conn = Redis.from_url(settings.REDIS_URL)
-    return Queue(name=QUEUE_NAME, connection=redis_conn)
-
-
 @router.post("/job", response_model=JobResponse)
-async def create_weather_job(
+def create_weather_job(
     job_data: JobCreate = JobCreate(),
     db: Session = Depends(get_db)
 ):
     """
     Create a new weather fetching job (manual trigger).
     Enqueues a job to fetch weather data for specified cities.
+    A plain ``def``: the sync session and Redis calls run in the threadpool.
     """
     try:
-        # Get Redis queue
-        queue = get_redis_queue()
-        
-        # Prepare cities configuration
-        cities_to_fetch = {}
-        for city_name in job_data.cities:
-            if city_name in settings.CITIES:
-                cities_to_fetch[city_name] = settings.CITIES[city_name]
+        # Prepare cities configuration from the registry (all cities by default)
+        cities_to_fetch = load_city_configs(db, job_data.cities)
         
         if not cities_to_fetch:
             raise HTTPException(
@@ -56,28 +88,26 @@ async def create_weather_job(
                 detail="No valid cities provided"
             )
         
-        # Enqueue job
-        job = queue.enqueue(
-            "app.worker.rq_worker.fetch_and_store_weather",
-            cities_to_fetch,
-            job_timeout=JOB_TIMEOUT,
-        )
+        # Record and enqueue job (cities already in flight are coalesced)
+        result = enqueue_weather_job(db, cities_to_fetch, JobTrigger.MANUAL)
         
-        # Create job history record
-        job_history = JobHistory(
-            job_id=job.id,
-            status=JobStatus.PENDING,
-            trigger=JobTrigger.MANUAL
-        )
-        db.add(job_history)
-        db.commit()
+        if not result["enqueued"]:
+            logger.info(f"Manual request attached to in-flight job {result['job_id']}")
+            return JobResponse(
+                job_id=result["job_id"],
+                status="coalesced",
+                message=f"All {result['coalesced']} cities are already being fetched"
+            )
         
-        logger.info(f"Created manual job {job.id} for cities: {list(cities_to_fetch.keys())}")
+        logger.info(f"Created manual job {result['job_id']} for cities: {list(cities_to_fetch.keys())}")
         
+        message = f"Weather fetch job created for {result['enqueued']} cities"
+        if result["coalesced"]:
+            message += f" ({result['coalesced']} already in flight)"
         return JobResponse(
-            job_id=job.id,
+            job_id=result["job_id"],
             status="queued",
-            message=f"Weather fetch job created for {len(cities_to_fetch)} cities"
+            message=message
         )
         
     except Exception as e:
@@ -86,53 +116,274 @@ async def create_weather_job(
 
 
 @router.get("/weather", response_model=WeatherListResponse)
-async def get_weather_data(db: Session = Depends(get_db)):
+async def get_weather_data(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Get current weather data for all cities.
-    Returns the latest weather information and last sync timestamp.
+    Serves the pre-serialized snapshot from Redis; PostgreSQL is only
+    queried on a cache miss (the worker republishes after each job).
+    Revalidation against the ETag / Last-Modified kept in Redis answers
+    304 without touching the snapshot or the database.
     """
+    redis_conn = get_redis()
+    # Read the version before the payload: the worker bumps it only after
+    # publishing, so the payload is never older than its validators.
+    # Sync Redis calls run in a thread so they never stall the event loop.
+    version = await asyncio.to_thread(ensure_resource_version, redis_conn, WEATHER_RESOURCE)
+    headers = version_headers(version)
+    if is_not_modified(request, version):
+        return Response(status_code=304, headers=headers)
+    
     try:
-        # Fetch all weather data
-        weather_records = db.query(WeatherData).all()
-        
-        if not weather_records:
-            return WeatherListResponse(data=[], last_sync=None)
-        
-        # Get the most recent update timestamp
-        last_sync = db.query(func.max(WeatherData.last_updated)).scalar()
-        
-        return WeatherListResponse(
-            data=[WeatherDataResponse.from_orm(record) for record in weather_records],
-            last_sync=last_sync
-        )
-        
+        payload = await asyncio.to_thread(get_weather_snapshot, redis_conn)
+    except Exception as e:
+        logger.warning(f"Weather snapshot unavailable, reading database: {str(e)}")
+        payload = None
+    
+    if payload is not None:
+        return Response(content=payload, media_type="application/json", headers=headers)
+    
+    try:
+        payload = await build_weather_snapshot_async(db)
     except Exception as e:
         logger.error(f"Error fetching weather data: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch weather data: {str(e)}")
+    
+    try:
+        await asyncio.to_thread(
+            publish_weather_snapshot, redis_conn, payload, only_if_missing=True
+        )
+    except Exception as e:
+        logger.warning(f"Failed to cache weather snapshot: {str(e)}")
+    
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+@router.get("/weather/nearest", response_model=List[NearestCityResponse])
+async def get_nearest_cities(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    k: int = Query(default=1, ge=1, le=100),
+):
+    """
+    The ``k`` registry cities nearest to a point, with great-circle
+    distances. Answered from this process's in-memory k-d tree.
+    """
+    index_sync = get_city_index_sync()
+    if not index_sync.ready:
+        raise HTTPException(status_code=503, detail="City index is still loading")
+    return index_sync.index.nearest(lat, lon, k)
+
+
+@router.get("/weather/stats")
+async def get_weather_stats(
+    window: str = "24h",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    group_by: GroupBy = "city",
+    metric: List[str] = Query(default=["temperature", "wind_speed"]),
+    city: Optional[List[str]] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Min, max, mean and p50/p90/p95 of the chosen metrics over a time window
+    (``start``/``end``, or the trailing ``window`` such as 1h, 24h, 7d),
+    grouped by city, region or across all cities. Computed by one aggregate
+    query over ``weather_readings`` and cached in Redis per window boundaries.
+    """
+    try:
+        validate_metrics(metric)
+        window_start, window_end = resolve_window(window, start, end)
+    except StatsRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cache_key = stats_cache_key(window_start, window_end, group_by, metric, city)
+    redis_conn = get_redis()
+    payload = await asyncio.to_thread(get_cached_stats, redis_conn, cache_key)
+    if payload is not None:
+        return Response(content=payload, media_type="application/json")
+    
+    try:
+        stats = await compute_weather_stats(db, window_start, window_end, group_by, metric, city)
+    except Exception as e:
+        logger.error(f"Error computing weather stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute weather stats: {str(e)}")
+    
+    payload = json.dumps(stats, separators=(",", ":")).encode()
+    await asyncio.to_thread(
+        set_cached_stats, redis_conn, cache_key, payload, stats_cache_ttl(window_end)
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/weather/stream")
+async def stream_weather_updates(request: Request):
+    """
+    Server-Sent Events stream of per-city weather updates.
+    Starts with the current snapshot (``event: snapshot``), then relays each
+    worker delta (``event: update``) from this process's single Redis
+    subscription, so open streams add no database load.
+    """
+    broadcaster = get_broadcaster()
+    queue = broadcaster.subscribe()
+    
+    async def event_stream():
+        try:
+            try:
+                snapshot = await asyncio.to_thread(get_weather_snapshot, get_redis())
+            except Exception as e:
+                logger.warning(f"Weather snapshot unavailable for stream: {str(e)}")
+                snapshot = None
+            if snapshot is not None:
+                yield b"event: snapshot\ndata: " + snapshot + b"\n\n"
+            
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing idle connections
+                    yield b": keep-alive\n\n"
+                    continue
+                yield f"event: update\ndata: {message}\n\n".encode()
+        finally:
+            broadcaster.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/forecast/{city}")
+async def get_city_forecast(
+    city: str,
+    request: Request,
+    hours: Optional[int] = Query(default=None, ge=1, le=384),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Hourly forecast for a city as columnar JSON: a ``time`` array plus one
+    array per variable. Reads a single compact row by primary key.
+    """
+    try:
+        forecast = await db.get(WeatherForecast, city)
+    except Exception as e:
+        logger.error(f"Error fetching forecast: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch forecast: {str(e)}")
+    if forecast is None:
+        raise HTTPException(status_code=404, detail=f"No forecast for {city!r}")
+    
+    fetched_at = forecast.fetched_at.replace(microsecond=0)
+    version = (f'"forecast-{int(fetched_at.timestamp())}"', fetched_at)
+    headers = version_headers(version)
+    if is_not_modified(request, version):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=serialize_forecast(forecast, hours),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@router.get("/export")
+async def export_data(
+    dataset: ExportDataset = "readings",
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    city: Optional[List[str]] = Query(default=None),
+):
+    """
+    Stream a bulk export of ``readings`` (history), ``weather`` (current
+    values) or ``jobs`` as NDJSON, CSV, Parquet or an Arrow IPC stream.
+    ``start``/``end`` bound the dataset's timestamp; ``city`` may repeat.
+    Rows are read through a server-side cursor and encoded batch by batch,
+    so memory stays flat however large the export is.
+    """
+    try:
+        body = stream_export(dataset, export_format, start, end, city)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    extension = "arrows" if export_format == "arrow" else export_format
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{extension}"'},
+    )
 
 
 @router.get("/jobs", response_model=List[JobHistoryResponse])
 async def get_job_history(
-    limit: int = 20,
-    db: Session = Depends(get_db)
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    trigger: Optional[JobTrigger] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get recent job history.
-    Returns the most recent job records for display on dashboard.
+    Get job history, newest first, optionally filtered by status/trigger.
+    Pages are keyset-paginated: pass the ``X-Next-Cursor`` response header
+    back as ``cursor`` to get the next page (absent on the last page).
+    Answers 304 from the Redis version token when no job changed.
     """
     try:
-        jobs = db.query(JobHistory)\
-            .order_by(JobHistory.created_at.desc())\
-            .limit(limit)\
-            .all()
+        after = decode_job_cursor(cursor) if cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    version = await asyncio.to_thread(ensure_resource_version, get_redis(), JOBS_RESOURCE)
+    headers = version_headers(version)
+    if is_not_modified(request, version):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        result = await db.execute(job_history_page_query(limit, after, status, trigger))
+        page, next_cursor = split_page(result.all(), limit)
         
-        return [JobHistoryResponse.from_orm(job) for job in jobs]
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return Response(
+            content=serialize_job_page(page),
+            media_type="application/json",
+            headers=headers,
+        )
         
     except Exception as e:
         logger.error(f"Error fetching job history: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch job history: {str(e)}")
 
 
+@router.get("/metrics")
+def get_pipeline_metrics():
+    """
+    Get fleet-wide pipeline counters recorded in Redis
+    (e.g. response cache hits and misses, limiter wait time) plus the
+    live upstream circuit breaker state.
+    """
+    try:
+        redis_conn = get_redis()
+        metrics = get_metrics(redis_conn)
+        metrics["breaker_state"] = get_circuit_breaker(redis_conn).state()
+        return metrics
+    except Exception as e:
+        logger.error(f"Error fetching metrics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch metrics: {str(e)}")
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    """Live connection pool stats (checked out, overflow) for this API process."""
+    return {
+        "role": settings.PROCESS_ROLE,
+        "sync": get_pool_stats(engine),
+        "async": get_pool_stats(async_engine.sync_engine),
+    }
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1,17 +1,25 @@
 from .schemas import (
     CityConfig,
+    CityCoordinates,
+    CityResponse,
+    CityUpdate,
     JobCreate,
     JobHistoryResponse,
     JobResponse,
+    NearestCityResponse,
     WeatherDataResponse,
     WeatherListResponse,
 )
 
 __all__ = [
     "CityConfig",
+    "CityCoordinates",
+    "CityResponse",
+    "CityUpdate",
     "JobCreate",
     "JobHistoryResponse",
     "JobResponse",
+    "NearestCityResponse",
     "WeatherDataResponse",
     "WeatherListResponse",
 ]
@@ -28,9 +28,9 @@ class WeatherListResponse(BaseModel):
 
 # Job Schemas
 class JobCreate(BaseModel):
-    cities: List[str] = Field(
-        default=["London", "New York", "Tokyo", "Cairo"],
-        description="List of cities to fetch weather data for"
+    cities: Optional[List[str]] = Field(
+        default=None,
+        description="Registry cities to fetch weather data for (omit for all)"
     )
 
 
@@ -48,13 +48,39 @@ class JobHistoryResponse(BaseModel):
     created_at: datetime
     completed_at: Optional[datetime]
     error_message: Optional[str]
+    parent_job_id: Optional[str] = None
+    coalesced_requests: int = 0
+    retry_of: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
 # City Configuration
-class CityConfig(BaseModel):
-    name: str
+class CityCoordinates(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class CityUpdate(CityCoordinates):
+    region: Optional[str] = Field(default=None, max_length=100)
+
+
+class CityConfig(CityUpdate):
+    name: str = Field(min_length=1, max_length=100)
+
+
+class CityResponse(CityConfig):
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class NearestCityResponse(BaseModel):
+    city: str
     latitude: float
-    longitude: float
\ No newline at end of file
+    longitude: float
+    distance_km: float
\ No newline at end of file
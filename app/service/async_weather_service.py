@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+from app.configuration import get_settings
+from app.database import get_redis
+from app.service.rate_limiter import get_circuit_breaker, get_rate_limiter
+from app.service.response_cache import WeatherResponseCache
+from app.service.weather_service import (
+    CURRENT_VARIABLES,
+    RETRY_BACKOFF_SECONDS,
+    WeatherResult,
+    chunk_cities,
+    parse_current_response,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def decode_flatbuffer_responses(data: bytes) -> List[Any]:
+    """Split an Open-Meteo flatbuffers payload into per-location responses."""
+    messages: List[Any] = []
+    total = len(data)
+    pos = 0
+    while pos < total:
+        length = int.from_bytes(data[pos:pos + 4], byteorder="little")
+        messages.append(WeatherApiResponse.GetRootAs(data, pos + 4))
+        pos += length + 4
+    return messages
+
+
+def is_retryable_async_error(exc: Exception) -> bool:
+    """Transport errors, timeouts and 5xx responses; never other 4xx."""
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return False
+
+
+class AsyncWeatherService:
+    """Asyncio Open-Meteo client with bounded parallelism over one shared pool."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self.api_url = settings.WEATHER_API_URL
+        self.batch_size = settings.WEATHER_BATCH_SIZE
+        self.max_concurrency = max_concurrency or settings.WEATHER_MAX_CONCURRENCY
+        self.timeout = timeout or settings.WEATHER_REQUEST_TIMEOUT_SECONDS
+        self.http_retries = settings.WEATHER_HTTP_RETRIES
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.response_cache: Optional[WeatherResponseCache] = None
+        if settings.WEATHER_CACHE_BACKEND == "redis":
+            self.response_cache = WeatherResponseCache(get_redis(), CURRENT_VARIABLES)
+        self.rate_limiter = get_rate_limiter(get_redis())
+        self.circuit_breaker = get_circuit_breaker(get_redis())
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    async def __aenter__(self) -> "AsyncWeatherService":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def _weather_api(self, params: Dict[str, str]) -> List[Any]:
+        """
+        Call Open-Meteo behind the fleet-wide rate limiter and circuit breaker.
+
+        Like the blocking service, connection errors, timeouts and 5xx
+        responses are retried up to ``WEATHER_HTTP_RETRIES`` times, taking
+        a fresh limiter token for each attempt.
+        """
+        await self.circuit_breaker.check_async()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    if self.rate_limiter is not None:
+                        await self.rate_limiter.acquire_async()
+                    response = await asyncio.wait_for(
+                        self.client.get(self.api_url, params=params),
+                        timeout=self.timeout,
+                    )
+                    response.raise_for_status()
+                break
+            except Exception as exc:
+                if attempt < self.http_retries and is_retryable_async_error(exc):
+                    await asyncio.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                    attempt += 1
+                    continue
+                await self.circuit_breaker.record_failure_async()
+                raise
+        await self.circuit_breaker.record_success_async()
+        return decode_flatbuffer_responses(response.content)
+
+    async def fetch_city_batch(
+        self, cities_config: Dict[str, Dict[str, float]]
+    ) -> Dict[str, Optional[WeatherResult]]:
+        """Fetch current weather for a chunk of cities in one request."""
+        city_names = list(cities_config.keys())
+        results: Dict[str, Optional[WeatherResult]] = dict.fromkeys(city_names)
+        if not city_names:
+            return results
+
+        params = {
+            "latitude": ",".join(str(cities_config[name]["latitude"]) for name in city_names),
+            "longitude": ",".join(str(cities_config[name]["longitude"]) for name in city_names),
+            "current": ",".join(CURRENT_VARIABLES),
+            "format": "flatbuffers",
+        }
+
+        try:
+            responses = await self._weather_api(params)
+        except Exception as exc:  # pragma: no cover - network errors
+            logger.error(
+                "Failed to fetch weather for %s: %s",
+                ", ".join(city_names),
+                exc or type(exc).__name__,
+            )
+            return results
+
+        if len(responses) != len(city_names):
+            logger.error(
+                "Weather batch returned %s responses for %s cities",
+                len(responses),
+                len(city_names),
+            )
+            return results
+
+        for city_name, response in zip(city_names, responses):
+            try:
+                results[city_name] = parse_current_response(response)
+            except Exception as exc:  # pragma: no cover - malformed payload
+                logger.error("Failed to decode %s weather: %s", city_name, exc)
+        return results
+
+    async def fetch_multiple_cities(
+        self,
+        cities_config: Dict[str, Dict[str, float]],
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Optional[WeatherResult]]:
+        """
+        Fetch all cities concurrently, at most ``max_concurrency`` requests
+        in flight. Total latency is bounded by the slowest request rather
+        than the sum of all requests. Cached cities are served from Redis.
+        """
+        results: Dict[str, Optional[WeatherResult]] = {}
+        to_fetch = cities_config
+        if self.response_cache is not None:
+            hits, to_fetch = self.response_cache.get_many(cities_config)
+            results.update(hits)
+
+        chunks = list(chunk_cities(to_fetch, batch_size or self.batch_size))
+        logger.info(
+            "Fetching %s cities in %s concurrent requests (limit %s)",
+            len(to_fetch),
+            len(chunks),
+            self.max_concurrency,
+        )
+        fetched: Dict[str, Optional[WeatherResult]] = {}
+        for chunk_result in await asyncio.gather(
+            *(self.fetch_city_batch(chunk) for chunk in chunks)
+        ):
+            fetched.update(chunk_result)
+
+        if self.response_cache is not None:
+            self.response_cache.set_many(to_fetch, fetched)
+        results.update(fetched)
+        return results
+
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple, TypedDict
+
+EARTH_RADIUS_KM = 6371.0088
+
+Point = Tuple[float, float, float]
+
+
+class NearestCity(TypedDict):
+    city: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+def to_unit_vector(latitude: float, longitude: float) -> Point:
+    """Map coordinates onto the unit sphere; chord length orders like great-circle distance."""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(squared_chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(squared_chord) / 2))
+
+
+class _KDTree:
+    """Static 3-d tree over unit vectors; nodes are ``(entry, axis, left, right)``."""
+
+    def __init__(self, points: List[Point]) -> None:
+        self.points = points
+        self.nodes: List[Tuple[int, int, int, int]] = []
+        self.root = self._build(list(range(len(points))), 0)
+
+    def _build(self, entries: List[int], depth: int) -> int:
+        if not entries:
+            return -1
+        axis = depth % 3
+        entries.sort(key=lambda entry: self.points[entry][axis])
+        mid = len(entries) // 2
+        node = len(self.nodes)
+        self.nodes.append((entries[mid], axis, -1, -1))
+        left = self._build(entries[:mid], depth + 1)
+        right = self._build(entries[mid + 1:], depth + 1)
+        self.nodes[node] = (entries[mid], axis, left, right)
+        return node
+
+    def search(
+        self, query: Point, k: int, live: Set[int], heap: List[Tuple[float, int]]
+    ) -> None:
+        """Push the ``k`` nearest live entries onto ``heap`` as ``(-d², entry)``."""
+        points = self.points
+        nodes = self.nodes
+
+        def visit(node: int) -> None:
+            if node < 0:
+                return
+            entry, axis, left, right = nodes[node]
+            point = points[entry]
+            if entry in live:
+                d2 = (
+                    (query[0] - point[0]) ** 2
+                    + (query[1] - point[1]) ** 2
+                    + (query[2] - point[2]) ** 2
+                )
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d2, entry))
+                elif d2 < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d2, entry))
+            diff = query[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                visit(far)
+
+        visit(self.root)
+
+
+class CityIndex:
+    """
+    In-memory nearest-city index.
+
+    A k-d tree over the registry as of the last rebuild answers queries in
+    O(log n). Changes since then are applied incrementally: updated or
+    deleted cities are tombstoned in the tree and new positions go to a
+    small overflow list that is scanned linearly. Once the overflow and
+    tombstones exceed ``rebuild_ratio`` of the tree, the tree is rebuilt.
+    """
+
+    def __init__(self, rebuild_ratio: float = 0.005, min_rebuild: int = 128) -> None:
+        self.rebuild_ratio = rebuild_ratio
+        self.min_rebuild = min_rebuild
+        self.cities: Dict[str, Tuple[float, float]] = {}
+        self._names: List[str] = []
+        self._tree = _KDTree([])
+        self._tree_entry: Dict[str, int] = {}
+        self._live: Set[int] = set()
+        self._overflow: Dict[str, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.cities
+
+    def rebuild(self, cities: Optional[Dict[str, Tuple[float, float]]] = None) -> None:
+        """Rebuild the tree from ``cities`` (default: the current registry)."""
+        if cities is not None:
+            self.cities = dict(cities)
+        self._names = list(self.cities.keys())
+        self._tree = _KDTree([to_unit_vector(*self.cities[name]) for name in self._names])
+        self._tree_entry = {name: entry for entry, name in enumerate(self._names)}
+        self._live = set(range(len(self._names)))
+        self._overflow = {}
+
+    def _tombstone(self, name: str) -> None:
+        entry = self._tree_entry.pop(name, None)
+        if entry is not None:
+            self._live.discard(entry)
+        self._overflow.pop(name, None)
+
+    def _maybe_rebuild(self) -> None:
+        pending = len(self._overflow) + len(self._names) - len(self._live)
+        if pending > max(self.min_rebuild, self.rebuild_ratio * len(self._names)):
+            self.rebuild()
+
+    def upsert(self, name: str, latitude: float, longitude: float) -> None:
+        if self.cities.get(name) == (latitude, longitude):
+            return
+        self._tombstone(name)
+        self.cities[name] = (latitude, longitude)
+        self._overflow[name] = to_unit_vector(latitude, longitude)
+        self._maybe_rebuild()
+
+    def remove(self, name: str) -> None:
+        if self.cities.pop(name, None) is None:
+            return
+        self._tombstone(name)
+        self._maybe_rebuild()
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) -> List[NearestCity]:
+        """The ``k`` registry cities closest to a point, nearest first."""
+        if k <= 0 or not self.cities:
+            return []
+        query = to_unit_vector(latitude, longitude)
+        heap: List[Tuple[float, int]] = []
+        self._tree.search(query, k, self._live, heap)
+
+        candidates = [(-neg_d2, self._names[entry]) for neg_d2, entry in heap]
+        for name, point in self._overflow.items():
+            d2 = sum((q - p) ** 2 for q, p in zip(query, point))
+            candidates.append((d2, name))
+        candidates.sort()
+
+        return [
+            {
+                "city": name,
+                "latitude": self.cities[name][0],
+                "longitude": self.cities[name][1],
+                "distance_km": round(chord_to_km(d2), 3),
+            }
+            for d2, name in candidates[:k]
+        ]
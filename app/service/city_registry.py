@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Dict, Iterable, Optional
+
+import redis.asyncio as aioredis
+from redis import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.configuration import get_settings
+from app.database import AsyncSessionLocal
+from app.models import City
+from app.service.city_index import CityIndex
+
+logger = logging.getLogger(__name__)
+
+CITY_CHANGES_CHANNEL = "weather:cities:changes"
+
+CityConfigs = Dict[str, Dict[str, float]]
+
+
+def load_city_configs(db: Session, names: Optional[Iterable[str]] = None) -> CityConfigs:
+    """Registry cities as ``{name: {latitude, longitude}}`` (all, or just ``names``)."""
+    query = db.query(City.name, City.latitude, City.longitude)
+    if names is not None:
+        query = query.filter(City.name.in_(list(names)))
+    return {
+        name: {"latitude": latitude, "longitude": longitude}
+        for name, latitude, longitude in query.order_by(City.name)
+    }
+
+
+def publish_city_change(redis_conn: Redis, city: Optional[City], name: str) -> None:
+    """Tell every API process to apply a committed registry change (None = deleted)."""
+    message = {"name": name}
+    if city is not None:
+        message.update(latitude=city.latitude, longitude=city.longitude)
+    try:
+        redis_conn.publish(CITY_CHANGES_CHANNEL, json.dumps(message))
+    except Exception as exc:
+        # Other processes catch up on their next resubscribe (full reload)
+        logger.warning("Failed to publish change for city %s: %s", name, exc)
+
+
+def apply_city_change(index: CityIndex, message: Dict) -> None:
+    if "latitude" in message:
+        index.upsert(message["name"], message["latitude"], message["longitude"])
+    else:
+        index.remove(message["name"])
+
+
+class CityIndexSync:
+    """
+    Keeps this process's ``CityIndex`` in step with the ``cities`` table.
+
+    The index is loaded once from the database after subscribing to the
+    change channel (so no change falls in between), then every change
+    published by a CRUD call is applied incrementally. After a lost
+    subscription the index is reloaded in full.
+    """
+
+    def __init__(self, index: CityIndex, redis_url: Optional[str] = None) -> None:
+        self.index = index
+        self.redis_url = redis_url or get_settings().REDIS_URL
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def reload(self) -> None:
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(select(City.name, City.latitude, City.longitude))
+            self.index.rebuild({name: (latitude, longitude) for name, latitude, longitude in rows})
+        self.ready = True
+        logger.info("City index loaded with %s cities", len(self.index))
+
+    async def _listen(self) -> None:
+        while True:
+            client = aioredis.from_url(self.redis_url)
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(CITY_CHANGES_CHANNEL)
+                    await self.reload()
+                    async for message in pubsub.listen():
+                        apply_city_change(self.index, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("City index sync interrupted: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+_city_index_sync: Optional[CityIndexSync] = None
+
+
+def get_city_index_sync() -> CityIndexSync:
+    """The process-wide city index and its sync task (started by the API)."""
+    global _city_index_sync
+    if _city_index_sync is None:
+        _city_index_sync = CityIndexSync(CityIndex())
+    return _city_index_sync
+
+
+async def get_city(db: AsyncSession, name: str) -> Optional[City]:
+    return await db.scalar(select(City).where(City.name == name))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable, List
+
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+INFLIGHT_KEY_PREFIX = "weather:inflight:"
+
+# Claim every free city for ARGV[1]; report the current owner of the others.
+_CLAIM_SCRIPT = """
+local owners = {}
+for i, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner then
+        owners[i] = owner
+    else
+        redis.call('SET', key, ARGV[1], 'EX', ARGV[2])
+        owners[i] = ''
+    end
+end
+return owners
+"""
+
+# Release only the claims still held by ARGV[1].
+_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+def _keys(city_names: Iterable[str]) -> List[str]:
+    return [f"{INFLIGHT_KEY_PREFIX}{name}" for name in city_names]
+
+
+def claim_cities(
+    redis_conn: Redis, city_names: List[str], owner: str, ttl_seconds: int
+) -> Dict[str, str]:
+    """
+    Atomically claim the cities that no other job has pending or in flight.
+
+    Returns:
+        City name -> owning job id for every city that was already claimed
+    """
+    if not city_names:
+        return {}
+    owners = redis_conn.eval(_CLAIM_SCRIPT, len(city_names), *_keys(city_names), owner, ttl_seconds)
+    return {
+        name: value.decode() if isinstance(value, bytes) else value
+        for name, value in zip(city_names, owners)
+        if value
+    }
+
+
+def release_cities(redis_conn: Redis, city_names: List[str], owner: str) -> int:
+    """Release the cities ``owner`` still holds; never fails the caller."""
+    if not city_names:
+        return 0
+    try:
+        return redis_conn.eval(_RELEASE_SCRIPT, len(city_names), *_keys(city_names), owner)
+    except Exception as exc:
+        logger.warning("Failed to release %s city claims: %s", len(city_names), exc)
+        return 0
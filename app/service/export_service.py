@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+
+from app.configuration import get_settings
+from app.database import AsyncSessionLocal
+from app.models import JobHistory, WeatherData, WeatherReading
+
+logger = logging.getLogger(__name__)
+
+ExportDataset = Literal["readings", "weather", "jobs"]
+ExportFormat = Literal["ndjson", "csv", "parquet", "arrow"]
+
+MEDIA_TYPES: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# (column name, table column, Arrow type name)
+_DATASETS: Dict[str, Dict[str, Any]] = {
+    "readings": {
+        "columns": [
+            ("city", WeatherReading.city, "string"),
+            ("observed_at", WeatherReading.observed_at, "timestamp"),
+            ("latitude", WeatherReading.latitude, "float64"),
+            ("longitude", WeatherReading.longitude, "float64"),
+            ("temperature", WeatherReading.temperature, "float64"),
+            ("wind_speed", WeatherReading.wind_speed, "float64"),
+        ],
+        "time": WeatherReading.observed_at,
+        "city": WeatherReading.city,
+        "order_by": (WeatherReading.observed_at, WeatherReading.city),
+    },
+    "weather": {
+        "columns": [
+            ("city", WeatherData.city, "string"),
+            ("latitude", WeatherData.latitude, "float64"),
+            ("longitude", WeatherData.longitude, "float64"),
+            ("temperature", WeatherData.temperature, "float64"),
+            ("wind_speed", WeatherData.wind_speed, "float64"),
+            ("last_updated", WeatherData.last_updated, "timestamp"),
+        ],
+        "time": WeatherData.last_updated,
+        "city": WeatherData.city,
+        "order_by": (WeatherData.city,),
+    },
+    "jobs": {
+        "columns": [
+            ("job_id", JobHistory.job_id, "string"),
+            ("status", JobHistory.status, "string"),
+            ("trigger", JobHistory.trigger, "string"),
+            ("created_at", JobHistory.created_at, "timestamp"),
+            ("completed_at", JobHistory.completed_at, "timestamp"),
+            ("error_message", JobHistory.error_message, "string"),
+            ("parent_job_id", JobHistory.parent_job_id, "string"),
+            ("retry_of", JobHistory.retry_of, "string"),
+            ("coalesced_requests", JobHistory.coalesced_requests, "int64"),
+        ],
+        "time": JobHistory.created_at,
+        "city": None,
+        "order_by": (JobHistory.created_at, JobHistory.id),
+    },
+}
+
+
+class ExportError(ValueError):
+    """Raised for an export the API cannot produce."""
+
+
+def build_export_query(
+    dataset: ExportDataset,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cities: Optional[Sequence[str]] = None,
+) -> Select:
+    """Column-only SELECT (plain tuples, no ORM entities) for ``dataset``."""
+    spec = _DATASETS[dataset]
+    query = select(*(column for _, column, _ in spec["columns"]))
+    if start is not None:
+        query = query.where(spec["time"] >= start)
+    if end is not None:
+        query = query.where(spec["time"] < end)
+    if cities:
+        if spec["city"] is None:
+            raise ExportError(f"The {dataset} export cannot be filtered by city")
+        query = query.where(spec["city"].in_(list(cities)))
+    return query.order_by(*spec["order_by"])
+
+
+def _plain(value: Any) -> Any:
+    """Enums to their values; columnar writers take datetimes as they are."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _text(value: Any) -> Any:
+    value = _plain(value)
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _load_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ExportError("Columnar exports need pyarrow installed") from exc
+    return pyarrow
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes are drained per batch."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class _Encoder:
+    """Turns batches of row tuples into output bytes for one format."""
+
+    def __init__(self, export_format: ExportFormat, columns: List[Tuple[str, Any, str]]) -> None:
+        self.format = export_format
+        self.names = [name for name, _, _ in columns]
+        self._writer = None
+        self._sink: Optional[_ChunkSink] = None
+        if export_format in ("parquet", "arrow"):
+            pa = _load_pyarrow()
+            types = {
+                "string": pa.string(),
+                "float64": pa.float64(),
+                "int64": pa.int64(),
+                "timestamp": pa.timestamp("us", tz="UTC"),
+            }
+            self._pa = pa
+            self.schema = pa.schema([(name, types[kind]) for name, _, kind in columns])
+
+    def header(self) -> bytes:
+        if self.format == "csv":
+            return self._csv([self.names])
+        if self.format in ("parquet", "arrow"):
+            self._sink = _ChunkSink()
+            if self.format == "parquet":
+                self._writer = self._pa.parquet.ParquetWriter(self._sink, self.schema)
+            else:
+                self._writer = self._pa.ipc.new_stream(self._sink, self.schema)
+        return b""
+
+    @staticmethod
+    def _csv(rows: Sequence[Sequence[Any]]) -> bytes:
+        out = io.StringIO()
+        csv.writer(out).writerows(rows)
+        return out.getvalue().encode()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        if self.format == "ndjson":
+            return "".join(
+                json.dumps(dict(zip(self.names, map(_text, row))), separators=(",", ":")) + "\n"
+                for row in rows
+            ).encode()
+        if self.format == "csv":
+            return self._csv([[_text(value) for value in row] for row in rows])
+
+        # Transpose the batch into one typed array per column; for Parquet
+        # each batch becomes its own row group.
+        arrays = [
+            self._pa.array([_plain(value) for value in column], type=field.type)
+            for column, field in zip(zip(*rows), self.schema)
+        ]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        if self._writer is None:
+            return b""
+        self._writer.close()
+        return self._sink.drain()
+
+
+def stream_export(
+    dataset: ExportDataset,
+    export_format: ExportFormat,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cities: Optional[Sequence[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Validate an export request and return its body as an async byte stream.
+
+    Raises :class:`ExportError` up front, before any bytes are produced, so
+    the route can still answer with a 400.
+    """
+    if start is not None and start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end is not None and end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is not None and end is not None and start >= end:
+        raise ExportError("Export start must be before its end")
+
+    query = build_export_query(dataset, start, end, cities)
+    encoder = _Encoder(export_format, _DATASETS[dataset]["columns"])
+    return _iter_export(query, encoder, dataset)
+
+
+async def _iter_export(query: Select, encoder: _Encoder, dataset: str) -> AsyncIterator[bytes]:
+    """
+    Encode the export in chunks of ``EXPORT_BATCH_ROWS`` rows.
+
+    Rows come from a server-side cursor (``yield_per``), so at most one
+    batch is held in memory however many rows match. The session is opened
+    here rather than injected because it has to outlive the route handler.
+    """
+    batch_rows = get_settings().EXPORT_BATCH_ROWS
+    exported = 0
+    yield encoder.header()
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_rows))
+        async for rows in result.partitions(batch_rows):
+            exported += len(rows)
+            yield encoder.encode(rows)
+    yield encoder.footer()
+    logger.info("Exported %s %s rows as %s", exported, dataset, encoder.format)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, TypedDict
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.configuration import get_settings
+from app.models import WeatherForecast
+from app.service.weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+# Stored as little-endian float32, one row of ``hours`` values per variable
+FORECAST_DTYPE = np.dtype("<f4")
+
+
+class ForecastRow(TypedDict):
+    city: str
+    latitude: float
+    longitude: float
+    fetched_at: datetime
+    start_time: datetime
+    interval_seconds: int
+    hours: int
+    variables: List[str]
+    values: bytes
+
+
+def decode_hourly_batch(responses: List[Any], variables: List[str]) -> Dict[str, Any]:
+    """
+    Decode the ``hourly`` block of a batch of location responses at once.
+
+    Each variable comes out of the flatbuffer as a whole NumPy array
+    (``ValuesAsNumpy``), so the only Python loop is over locations and
+    variables, never over hours. Returns a ``(locations, variables, hours)``
+    float32 array plus the shared time axis.
+    """
+    hourly = [response.Hourly() for response in responses]
+    first = hourly[0]
+    hours = (first.TimeEnd() - first.Time()) // first.Interval()
+    values = np.full((len(responses), len(variables), hours), np.nan, dtype=FORECAST_DTYPE)
+    for row, block in enumerate(hourly):
+        for column in range(min(block.VariablesLength(), len(variables))):
+            series = block.Variables(column).ValuesAsNumpy()
+            count = min(series.shape[0], hours)
+            values[row, column, :count] = series[:count]
+    return {
+        "start": first.Time(),
+        "interval": first.Interval(),
+        "values": values,
+        "latitudes": np.fromiter((r.Latitude() for r in responses), dtype=np.float64),
+        "longitudes": np.fromiter((r.Longitude() for r in responses), dtype=np.float64),
+    }
+
+
+def fetch_forecast_batch(
+    service: WeatherService, cities_config: Dict[str, Dict[str, float]]
+) -> List[ForecastRow]:
+    """Fetch hourly forecasts for a chunk of cities in one upstream request."""
+    settings = get_settings()
+    variables = settings.FORECAST_HOURLY_VARIABLES
+    city_names = list(cities_config.keys())
+    params = {
+        "latitude": [cities_config[name]["latitude"] for name in city_names],
+        "longitude": [cities_config[name]["longitude"] for name in city_names],
+        "hourly": variables,
+        "forecast_days": settings.FORECAST_DAYS,
+        "timezone": "UTC",
+    }
+    responses = service.fetch_raw(params)
+    if len(responses) != len(city_names):
+        raise ValueError(
+            f"Forecast batch returned {len(responses)} responses for {len(city_names)} cities"
+        )
+
+    batch = decode_hourly_batch(responses, variables)
+    fetched_at = datetime.now(timezone.utc)
+    start_time = datetime.fromtimestamp(batch["start"], tz=timezone.utc)
+    return [
+        {
+            "city": city_name,
+            "latitude": float(batch["latitudes"][row]),
+            "longitude": float(batch["longitudes"][row]),
+            "fetched_at": fetched_at,
+            "start_time": start_time,
+            "interval_seconds": batch["interval"],
+            "hours": batch["values"].shape[2],
+            "variables": variables,
+            "values": batch["values"][row].tobytes(),
+        }
+        for row, city_name in enumerate(city_names)
+    ]
+
+
+def upsert_forecasts(db: Session, rows: List[ForecastRow]) -> int:
+    """Replace each city's forecast (one compact row per city, no commit)."""
+    chunk_size = get_settings().DB_UPSERT_CHUNK_SIZE
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(WeatherForecast).values(rows[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["city"],
+            set_={
+                column: stmt.excluded[column]
+                for column in (
+                    "latitude", "longitude", "fetched_at", "start_time",
+                    "interval_seconds", "hours", "variables", "values",
+                )
+            },
+        )
+        db.execute(stmt)
+    return len(rows)
+
+
+def serialize_forecast(forecast: WeatherForecast, hours: Optional[int] = None) -> bytes:
+    """
+    Encode a stored forecast as columnar JSON (one array per variable).
+
+    The blob is viewed in place with ``np.frombuffer``; the time axis and
+    rounding are computed as whole-array operations.
+    """
+    count = forecast.hours if hours is None else min(hours, forecast.hours)
+    values = np.frombuffer(forecast.values, dtype=FORECAST_DTYPE).reshape(
+        len(forecast.variables), forecast.hours
+    )[:, :count]
+    start = np.datetime64(int(forecast.start_time.timestamp()), "s")
+    times = start + np.arange(count) * np.timedelta64(forecast.interval_seconds, "s")
+
+    rounded = np.round(values.astype(np.float64), 2).astype(object)
+    rounded[np.isnan(values)] = None  # JSON has no NaN
+    payload = {
+        "city": forecast.city,
+        "latitude": forecast.latitude,
+        "longitude": forecast.longitude,
+        "fetched_at": forecast.fetched_at.isoformat(),
+        "interval_seconds": forecast.interval_seconds,
+        "time": np.datetime_as_string(times, unit="s", timezone="UTC").tolist(),
+        **dict(zip(forecast.variables, rounded.tolist())),
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional
+
+from redis import Redis
+
+from app.service.metrics import incr_metric, set_metric
+from app.service.weather_service import WeatherResult
+
+logger = logging.getLogger(__name__)
+
+GRID_CELLS_KEY = "weather:grid_cells"
+COORD_PRECISION = 4
+
+
+def _format_point(latitude: float, longitude: float) -> str:
+    return f"{latitude:.{COORD_PRECISION}f},{longitude:.{COORD_PRECISION}f}"
+
+
+class GridCellPlan:
+    """
+    Upstream requests for a job, deduplicated by model grid cell.
+
+    ``requests`` maps a request key to the coordinates to fetch and
+    ``members`` maps the same key to every city that shares the result.
+    """
+
+    def __init__(self) -> None:
+        self.requests: Dict[str, Dict[str, float]] = {}
+        self.members: Dict[str, List[str]] = {}
+
+    def add(self, key: str, coords: Dict[str, float], city_name: str) -> None:
+        self.requests.setdefault(key, coords)
+        self.members.setdefault(key, []).append(city_name)
+
+    @property
+    def city_count(self) -> int:
+        return sum(len(cities) for cities in self.members.values())
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Cities served per upstream location (1.0 means no savings)."""
+        return self.city_count / len(self.requests) if self.requests else 1.0
+
+    def fan_out(
+        self, results: Dict[str, Optional[WeatherResult]]
+    ) -> Dict[str, Optional[WeatherResult]]:
+        """Copy each request's result to every city in its grid cell."""
+        return {
+            city_name: results.get(key)
+            for key, cities in self.members.items()
+            for city_name in cities
+        }
+
+
+def plan_grid_fetch(
+    redis_conn: Redis, cities_config: Dict[str, Dict[str, float]]
+) -> GridCellPlan:
+    """
+    Group cities by their learned grid cell.
+
+    Cities whose cell is known are fetched once per cell at the snapped
+    cell coordinates; cities not seen before (or whose configured
+    coordinates changed) are fetched on their own so their cell is learned.
+    """
+    plan = GridCellPlan()
+    names = list(cities_config.keys())
+    known: List[Optional[bytes]] = [None] * len(names)
+    if names:
+        try:
+            known = redis_conn.hmget(GRID_CELLS_KEY, names)
+        except Exception as exc:
+            logger.warning("Grid cell mapping unavailable: %s", exc)
+
+    for city_name, mapping in zip(names, known):
+        coords = cities_config[city_name]
+        requested = _format_point(coords["latitude"], coords["longitude"])
+        if mapping:
+            source, cell = mapping.decode().split("|")
+            if source == requested:
+                latitude, longitude = (float(value) for value in cell.split(","))
+                plan.add(
+                    f"cell:{cell}",
+                    {"latitude": latitude, "longitude": longitude},
+                    city_name,
+                )
+                continue
+        plan.add(f"city:{city_name}", coords, city_name)
+    return plan
+
+
+def learn_grid_cells(
+    redis_conn: Redis,
+    cities_config: Dict[str, Dict[str, float]],
+    results: Dict[str, Optional[WeatherResult]],
+) -> None:
+    """Persist the snapped grid cell Open-Meteo reported for each city."""
+    mapping = {
+        city_name: "|".join(
+            (
+                _format_point(cities_config[city_name]["latitude"], cities_config[city_name]["longitude"]),
+                _format_point(result["latitude"], result["longitude"]),
+            )
+        )
+        for city_name, result in results.items()
+        if result
+    }
+    if not mapping:
+        return
+    try:
+        redis_conn.hset(GRID_CELLS_KEY, mapping=mapping)
+    except Exception as exc:
+        logger.warning("Failed to persist grid cells: %s", exc)
+
+
+def record_dedup_metrics(redis_conn: Redis, plan: GridCellPlan) -> None:
+    incr_metric(redis_conn, "grid_cities", plan.city_count)
+    incr_metric(redis_conn, "grid_upstream_locations", len(plan.requests))
+    set_metric(redis_conn, "grid_dedup_ratio_last", round(plan.dedup_ratio, 3))
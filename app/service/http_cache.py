@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from redis import Redis
+from starlette.requests import Request
+
+logger = logging.getLogger(__name__)
+
+WEATHER_RESOURCE = "weather"
+JOBS_RESOURCE = "jobs"
+VERSION_KEY_PREFIX = "weather:version:"
+
+ResourceVersion = Tuple[str, datetime]
+
+
+def _version_key(resource: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{resource}"
+
+
+def bump_resource_version(redis_conn: Redis, resource: str) -> None:
+    """
+    Mark ``resource`` as changed; call after the change is committed.
+
+    The token combines a counter with the bump time so it never repeats,
+    even if Redis loses the key. Never fails the caller.
+    """
+    key = _version_key(resource)
+    try:
+        now = time.time()
+        sequence = redis_conn.hincrby(key, "seq", 1)
+        redis_conn.hset(key, mapping={"etag": f"{sequence}.{int(now * 1000):x}", "modified": int(now)})
+    except Exception as exc:
+        logger.warning("Failed to bump %s version: %s", resource, exc)
+
+
+def get_resource_version(redis_conn: Redis, resource: str) -> Optional[ResourceVersion]:
+    """The current (etag, last-modified) of ``resource``; None if unknown."""
+    try:
+        etag, modified = redis_conn.hmget(_version_key(resource), ["etag", "modified"])
+    except Exception as exc:
+        logger.warning("Failed to read %s version: %s", resource, exc)
+        return None
+    if etag is None or modified is None:
+        return None
+    return f'"{resource}-{etag.decode()}"', datetime.fromtimestamp(int(modified), tz=timezone.utc)
+
+
+def ensure_resource_version(redis_conn: Redis, resource: str) -> Optional[ResourceVersion]:
+    """Return the current version, starting one if Redis has none yet."""
+    version = get_resource_version(redis_conn, resource)
+    if version is None:
+        bump_resource_version(redis_conn, resource)
+        version = get_resource_version(redis_conn, resource)
+    return version
+
+
+def version_headers(version: Optional[ResourceVersion]) -> Dict[str, str]:
+    """Validator headers; clients must revalidate before reusing a copy."""
+    headers = {"Cache-Control": "no-cache"}
+    if version is not None:
+        etag, last_modified = version
+        headers["ETag"] = etag
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, version: Optional[ResourceVersion]) -> bool:
+    """
+    Evaluate ``If-None-Match`` / ``If-Modified-Since`` against ``version``
+    (RFC 9110: when If-None-Match is present, If-Modified-Since is ignored).
+    """
+    if version is None:
+        return False
+    etag, last_modified = version
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+from sqlalchemy import Select, select, tuple_
+
+from app.models import JobHistory, JobStatus, JobTrigger
+
+JobCursor = Tuple[datetime, int]
+
+# Same fields, in the same order, as ``JobHistoryResponse``
+JOB_HISTORY_COLUMNS = (
+    JobHistory.id,
+    JobHistory.job_id,
+    JobHistory.status,
+    JobHistory.trigger,
+    JobHistory.created_at,
+    JobHistory.completed_at,
+    JobHistory.error_message,
+    JobHistory.parent_job_id,
+    JobHistory.coalesced_requests,
+    JobHistory.retry_of,
+)
+_JOB_HISTORY_FIELDS = tuple(column.key for column in JOB_HISTORY_COLUMNS)
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a pagination cursor that was not issued by this API."""
+
+
+def encode_job_cursor(job: Any) -> str:
+    """Opaque cursor pointing just past ``job`` in newest-first order."""
+    raw = f"{job.created_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_job_cursor(cursor: str) -> JobCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, job_pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(job_pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def job_history_page_query(
+    limit: int,
+    cursor: Optional[JobCursor] = None,
+    status: Optional[JobStatus] = None,
+    trigger: Optional[JobTrigger] = None,
+) -> Select:
+    """
+    Newest-first page of job history using keyset pagination.
+
+    The row comparison ``(created_at, id) < cursor`` is answered by a
+    backward scan of ``ix_job_history_created_at_id`` (or the status
+    index), so deep pages cost the same as the first one. One extra row
+    is fetched to tell whether a next page exists. Only
+    ``JOB_HISTORY_COLUMNS`` are selected, so rows come back as plain
+    tuples (with attribute access) instead of ORM instances.
+    """
+    query = select(*JOB_HISTORY_COLUMNS)
+    if status is not None:
+        query = query.where(JobHistory.status == status)
+    if trigger is not None:
+        query = query.where(JobHistory.trigger == trigger)
+    if cursor is not None:
+        query = query.where(tuple_(JobHistory.created_at, JobHistory.id) < cursor)
+    return query.order_by(JobHistory.created_at.desc(), JobHistory.id.desc()).limit(limit + 1)
+
+
+def split_page(
+    jobs: Sequence[Any], limit: int
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """Trim the look-ahead row and return the page plus its next cursor."""
+    if len(jobs) <= limit:
+        return jobs, None
+    page = jobs[:limit]
+    return page, encode_job_cursor(page[-1])
+
+
+def serialize_job_page(jobs: Sequence[Sequence[Any]]) -> bytes:
+    """Encode page rows as the /api/jobs JSON list, skipping model validation."""
+    return orjson.dumps(
+        [dict(zip(_JOB_HISTORY_FIELDS, job)) for job in jobs], option=orjson.OPT_UTC_Z
+    )
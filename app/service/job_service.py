@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple, TypedDict
+
+from redis import Redis
+from rq import Queue
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.configuration import get_settings
+from app.database import get_redis
+from app.models import JobHistory, JobStatus, JobTrigger
+from app.service.coalescing import claim_cities, release_cities
+from app.service.http_cache import JOBS_RESOURCE, bump_resource_version
+from app.service.weather_service import chunk_cities
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = "weather-jobs"
+JOB_TIMEOUT = "5m"
+JOB_FUNCTION = "app.worker.rq_worker.fetch_and_store_weather"
+JOB_STATS_KEY = "weather:jobs:stats"
+MAINTENANCE_FUNCTION = "app.worker.maintenance.run_history_maintenance"
+MAINTENANCE_GATE_KEY = "weather:maintenance:history"
+FORECAST_FUNCTION = "app.worker.rq_worker.fetch_and_store_forecasts"
+FORECAST_GATE_KEY = "weather:forecast:refresh"
+
+ACTIVE_STATUSES = (JobStatus.PENDING, JobStatus.PROCESSING)
+# A run whose own cities are being retried is settled by its retry jobs
+SETTLEABLE_STATUSES = ACTIVE_STATUSES + (JobStatus.RETRYING,)
+
+
+class EnqueueResult(TypedDict):
+    job_id: str
+    enqueued: int
+    coalesced: int
+
+
+def get_queue(redis_conn: Optional[Redis] = None) -> Queue:
+    """Return the weather job queue on the shared Redis pool."""
+    return Queue(name=QUEUE_NAME, connection=redis_conn or get_redis())
+
+
+def enqueue_weather_job(
+    db: Session,
+    cities_config: Dict[str, Dict[str, float]],
+    trigger: JobTrigger,
+    redis_conn: Optional[Redis] = None,
+    shard_size: Optional[int] = None,
+) -> EnqueueResult:
+    """
+    Record and enqueue a weather fetch run.
+
+    With ``JOB_COALESCING`` each city is claimed in Redis for the run; cities
+    already pending or in flight in another run are skipped and that run's
+    ``coalesced_requests`` counter is bumped. If every city is taken, nothing
+    is enqueued and the id of the in-flight run is returned instead.
+
+    Runs larger than ``shard_size`` (default ``JOB_SHARD_SIZE``) fan out
+    into one shard job per chunk, all linked to a parent run row through
+    ``JobHistory.parent_job_id``; the last shard to finish settles the
+    run's status. Smaller runs are a single job.
+
+    ``JobHistory`` rows are committed before any job becomes visible to
+    workers, so a fast worker always finds them. All jobs and the enqueue
+    counters are sent to Redis in a single pipeline.
+    """
+    settings = get_settings()
+    queue = get_queue(redis_conn)
+    run_id = str(uuid.uuid4())
+
+    taken: Dict[str, str] = {}
+    if settings.JOB_COALESCING:
+        taken = claim_cities(
+            queue.connection,
+            list(cities_config.keys()),
+            run_id,
+            settings.JOB_COALESCE_TTL_SECONDS,
+        )
+    to_fetch = {name: coords for name, coords in cities_config.items() if name not in taken}
+
+    if taken:
+        owners = Counter(taken.values())
+        db.query(JobHistory).filter(JobHistory.job_id.in_(owners.keys())).update(
+            {JobHistory.coalesced_requests: JobHistory.coalesced_requests + 1},
+            synchronize_session=False,
+        )
+        db.commit()
+        bump_resource_version(queue.connection, JOBS_RESOURCE)
+        queue.connection.hincrby(JOB_STATS_KEY, "coalesced_cities", len(taken))
+        if not to_fetch:
+            attached_to = owners.most_common(1)[0][0]
+            logger.info(
+                "All %s cities already in flight; attached to run %s",
+                len(cities_config),
+                attached_to,
+            )
+            return {"job_id": attached_to, "enqueued": 0, "coalesced": len(taken)}
+        logger.info("Coalesced %s cities into in-flight runs", len(taken))
+
+    shard_size = shard_size or settings.JOB_SHARD_SIZE
+    shards = list(chunk_cities(to_fetch, shard_size))
+
+    db.add(JobHistory(job_id=run_id, status=JobStatus.PENDING, trigger=trigger))
+    shard_jobs: List[Tuple[str, Dict[str, Dict[str, float]]]] = []
+    if len(shards) == 1:
+        shard_jobs.append((run_id, shards[0]))
+    else:
+        for shard in shards:
+            shard_id = str(uuid.uuid4())
+            shard_jobs.append((shard_id, shard))
+            db.add(
+                JobHistory(
+                    job_id=shard_id,
+                    status=JobStatus.PENDING,
+                    trigger=trigger,
+                    parent_job_id=run_id,
+                )
+            )
+
+    try:
+        db.commit()
+        with queue.connection.pipeline() as pipe:
+            for job_id, shard in shard_jobs:
+                queue.enqueue(
+                    JOB_FUNCTION,
+                    shard,
+                    job_id=job_id,
+                    job_timeout=JOB_TIMEOUT,
+                    pipeline=pipe,
+                )
+            pipe.hincrby(JOB_STATS_KEY, f"enqueued:{trigger.value}", 1)
+            pipe.hincrby(JOB_STATS_KEY, "shards", len(shard_jobs))
+            pipe.hset(
+                JOB_STATS_KEY,
+                "last_enqueued_at",
+                datetime.now(timezone.utc).isoformat(),
+            )
+            pipe.execute()
+    except Exception as exc:
+        release_cities(queue.connection, list(to_fetch.keys()), run_id)
+        db.rollback()
+        job_ids = [run_id] + [job_id for job_id, _ in shard_jobs]
+        db.query(JobHistory).filter(JobHistory.job_id.in_(job_ids)).update(
+            {
+                JobHistory.status: JobStatus.FAILED,
+                JobHistory.completed_at: datetime.now(timezone.utc),
+                JobHistory.error_message: f"Enqueue failed: {exc}"[:500],
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        bump_resource_version(queue.connection, JOBS_RESOURCE)
+        raise
+
+    bump_resource_version(queue.connection, JOBS_RESOURCE)
+    if len(shard_jobs) > 1:
+        logger.info(
+            "Run %s fanned out into %s shards of up to %s cities",
+            run_id,
+            len(shard_jobs),
+            shard_size,
+        )
+    return {"job_id": run_id, "enqueued": len(to_fetch), "coalesced": len(taken)}
+
+
+def release_job_cities(
+    redis_conn: Redis, job_record: JobHistory, city_names: List[str]
+) -> int:
+    """Release the coalescing claims a finished job held on its cities."""
+    if not get_settings().JOB_COALESCING:
+        return 0
+    owner = job_record.parent_job_id or job_record.job_id
+    return release_cities(redis_conn, city_names, owner)
+
+
+def retry_delay_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the ``attempt``-th retry (1-based)."""
+    base = get_settings().JOB_RETRY_BASE_DELAY_SECONDS
+    return base * 2 ** (attempt - 1) + random.uniform(0, base)
+
+
+def record_retry_job(db: Session, job_record: JobHistory) -> str:
+    """
+    Add the ``JobHistory`` row of a retry job for ``job_record`` (no commit).
+
+    The retry belongs to the same run as the original job; for a job that
+    is not part of a sharded run, the original job itself acts as the run
+    and is settled once its retries finish.
+    """
+    retry_id = str(uuid.uuid4())
+    db.add(
+        JobHistory(
+            job_id=retry_id,
+            status=JobStatus.PENDING,
+            trigger=job_record.trigger,
+            parent_job_id=job_record.parent_job_id or job_record.job_id,
+            retry_of=job_record.job_id,
+        )
+    )
+    return retry_id
+
+
+def enqueue_retry_job(
+    retry_id: str,
+    cities_config: Dict[str, Dict[str, float]],
+    attempt: int,
+    redis_conn: Optional[Redis] = None,
+) -> float:
+    """
+    Schedule a recorded retry job after an exponential, jittered delay.
+
+    The job sits in RQ's scheduled registry until it is due, so no worker
+    slot is held while waiting. Returns the delay in seconds.
+    """
+    delay = retry_delay_seconds(attempt)
+    get_queue(redis_conn).enqueue_in(
+        timedelta(seconds=delay),
+        JOB_FUNCTION,
+        cities_config,
+        retry_attempt=attempt,
+        job_id=retry_id,
+        job_timeout=JOB_TIMEOUT,
+    )
+    return delay
+
+
+def enqueue_history_maintenance(redis_conn: Optional[Redis] = None) -> Optional[str]:
+    """
+    Enqueue readings rollup/retention maintenance at most once per
+    ``HISTORY_MAINTENANCE_INTERVAL_SECONDS`` across all schedulers.
+    Returns the job id, or None when a recent run already covers it.
+    """
+    redis_conn = redis_conn or get_redis()
+    interval = get_settings().HISTORY_MAINTENANCE_INTERVAL_SECONDS
+    if not redis_conn.set(MAINTENANCE_GATE_KEY, 1, nx=True, ex=interval):
+        return None
+    job = get_queue(redis_conn).enqueue(MAINTENANCE_FUNCTION, job_timeout=JOB_TIMEOUT)
+    return job.id
+
+
+def enqueue_forecast_jobs(
+    load_cities: Callable[[], Dict[str, Dict[str, float]]],
+    redis_conn: Optional[Redis] = None,
+) -> int:
+    """
+    Enqueue forecast ingestion for every city, sharded by ``JOB_SHARD_SIZE``,
+    at most once per ``FORECAST_REFRESH_SECONDS`` across all schedulers.
+
+    The gate is claimed first; ``load_cities`` is only called when a
+    refresh is actually due, so ordinary ticks never read the registry.
+    Returns the number of shard jobs enqueued (0 when not due).
+    """
+    settings = get_settings()
+    redis_conn = redis_conn or get_redis()
+    if not redis_conn.set(FORECAST_GATE_KEY, 1, nx=True, ex=settings.FORECAST_REFRESH_SECONDS):
+        return 0
+    try:
+        cities_config = load_cities()
+    except Exception:
+        redis_conn.delete(FORECAST_GATE_KEY)  # let the next tick try again
+        raise
+    if not cities_config:
+        redis_conn.delete(FORECAST_GATE_KEY)
+        return 0
+    queue = get_queue(redis_conn)
+    shards = list(chunk_cities(cities_config, settings.JOB_SHARD_SIZE))
+    with redis_conn.pipeline() as pipe:
+        for shard in shards:
+            queue.enqueue(FORECAST_FUNCTION, shard, job_timeout=JOB_TIMEOUT, pipeline=pipe)
+        pipe.execute()
+    return len(shards)
+
+
+def mark_run_processing(db: Session, parent_job_id: str) -> None:
+    """Move a run to PROCESSING when its first shard starts (no commit)."""
+    db.query(JobHistory).filter(
+        JobHistory.job_id == parent_job_id,
+        JobHistory.status == JobStatus.PENDING,
+    ).update({JobHistory.status: JobStatus.PROCESSING}, synchronize_session=False)
+
+
+def settle_run_status(db: Session, parent_job_id: str) -> Optional[JobStatus]:
+    """
+    Aggregate child statuses (shards and retry jobs) onto the parent run
+    once every child is done. RETRYING children count as done; their
+    outcome is carried by the retry job that replaced them.
+
+    The run row is locked while shards are counted, so concurrent shards
+    finishing at the same moment settle the run exactly once. Commits.
+
+    Returns:
+        The run's final status, or None while shards are still active
+    """
+    run = (
+        db.query(JobHistory)
+        .filter(JobHistory.job_id == parent_job_id)
+        .with_for_update()
+        .first()
+    )
+    if run is None:
+        db.rollback()
+        return None
+
+    counts: Dict[JobStatus, int] = dict(
+        db.query(JobHistory.status, func.count(JobHistory.id))
+        .filter(JobHistory.parent_job_id == parent_job_id)
+        .group_by(JobHistory.status)
+        .all()
+    )
+    if run.status not in SETTLEABLE_STATUSES or any(
+        counts.get(status) for status in ACTIVE_STATUSES
+    ):
+        db.commit()
+        return None
+
+    failed = counts.get(JobStatus.FAILED, 0)
+    total = sum(counts.values())
+    run.completed_at = datetime.now(timezone.utc)
+    if failed:
+        run.status = JobStatus.FAILED
+        run.error_message = f"{failed}/{total} jobs failed"
+    else:
+        run.status = JobStatus.COMPLETED
+    db.commit()
+    bump_resource_version(get_redis(), JOBS_RESOURCE)
+
+    logger.info("Run %s settled as %s (%s jobs)", parent_job_id, run.status.value, total)
+    return run.status
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Iterable, Mapping, Optional, Set
+
+import redis.asyncio as aioredis
+from redis import Redis
+
+from app.configuration import get_settings
+
+logger = logging.getLogger(__name__)
+
+UPDATES_CHANNEL = "weather:updates"
+
+
+def encode_weather_update(rows: Iterable[Mapping]) -> str:
+    """Compact per-city delta published after a worker commit."""
+    return json.dumps(
+        {
+            "cities": [
+                {
+                    "city": row["city"],
+                    "temperature": row["temperature"],
+                    "wind_speed": row["wind_speed"],
+                    "last_updated": row["last_updated"].isoformat(),
+                }
+                for row in rows
+            ]
+        },
+        separators=(",", ":"),
+    )
+
+
+def publish_weather_update(redis_conn: Redis, rows: Iterable[Mapping]) -> int:
+    """Publish a delta for ``rows``; returns the number of API processes reached."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    return redis_conn.publish(UPDATES_CHANNEL, encode_weather_update(rows))
+
+
+class WeatherUpdateBroadcaster:
+    """
+    One Redis subscription per API process, fanned out to every connected
+    client through bounded in-memory queues.
+
+    Open streams cost a queue each and nothing in Redis or PostgreSQL. A
+    client that stops reading loses its oldest pending updates rather than
+    holding memory or slowing the others down.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, queue_size: Optional[int] = None) -> None:
+        settings = get_settings()
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.queue_size = queue_size or settings.SSE_CLIENT_QUEUE_SIZE
+        self._clients: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._clients.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._clients.discard(queue)
+
+    def broadcast(self, message: str) -> None:
+        for queue in self._clients:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _listen(self) -> None:
+        """Relay channel messages to clients, reconnecting after Redis errors."""
+        while True:
+            client = aioredis.from_url(self.redis_url)
+            try:
+                async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(UPDATES_CHANNEL)
+                    logger.info("Subscribed to %s", UPDATES_CHANNEL)
+                    async for message in pubsub.listen():
+                        data = message["data"]
+                        self.broadcast(data.decode() if isinstance(data, bytes) else data)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Weather update subscription lost: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+_broadcaster: Optional[WeatherUpdateBroadcaster] = None
+
+
+def get_broadcaster() -> WeatherUpdateBroadcaster:
+    """The process-wide broadcaster (started by the API at startup)."""
+    global _broadcaster
+    if _broadcaster is None:
+        _broadcaster = WeatherUpdateBroadcaster()
+    return _broadcaster
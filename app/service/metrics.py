@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import logging
+from typing import Dict
+
+from redis import Redis
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "weather:metrics"
+
+
+def incr_metric(redis_conn: Redis, name: str, amount: float = 1) -> None:
+    """Add ``amount`` to a fleet-wide counter; metrics never fail the caller."""
+    try:
+        if isinstance(amount, int):
+            redis_conn.hincrby(METRICS_KEY, name, amount)
+        else:
+            redis_conn.hincrbyfloat(METRICS_KEY, name, amount)
+    except Exception as exc:
+        logger.debug("Failed to record metric %s: %s", name, exc)
+
+
+def set_metric(redis_conn: Redis, name: str, value: float) -> None:
+    """Overwrite a gauge value (e.g. a ratio from the latest job)."""
+    try:
+        redis_conn.hset(METRICS_KEY, name, value)
+    except Exception as exc:
+        logger.debug("Failed to record metric %s: %s", name, exc)
+
+
+def get_metrics(redis_conn: Redis) -> Dict[str, float]:
+    """Return every recorded counter and gauge."""
+    metrics: Dict[str, float] = {}
+    for name, value in redis_conn.hgetall(METRICS_KEY).items():
+        number = float(value)
+        metrics[name.decode()] = int(number) if number.is_integer() else number
+    return metrics
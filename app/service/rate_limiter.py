@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from redis import Redis
+
+from app.configuration import get_settings
+from app.service.metrics import METRICS_KEY, incr_metric, set_metric
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "weather:ratelimit:openmeteo"
+BREAKER_FAILURES_KEY = "weather:breaker:openmeteo:failures"
+BREAKER_OPEN_UNTIL_KEY = "weather:breaker:openmeteo:open_until"
+BREAKER_PROBE_KEY = "weather:breaker:openmeteo:probe"
+
+# Reserve ARGV[4] tokens from a bucket refilled at ARGV[1] tokens/s up to
+# ARGV[2]. The bucket may go into debt; the caller waits out the returned
+# number of seconds, so concurrent callers are served in arrival order.
+_RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+tokens = tokens - requested
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the upstream while the breaker is open."""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket shared by every process talking to the same Redis.
+
+    ``clock`` is injectable so the bucket can be exercised against a local
+    Redis or a fakeredis stand-in without real waiting.
+    """
+
+    def __init__(
+        self,
+        redis_conn: Redis,
+        rate: float,
+        capacity: int,
+        key: str = RATE_LIMIT_KEY,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.redis = redis_conn
+        self.rate = rate
+        self.capacity = capacity
+        self.key = key
+        self.clock = clock
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take ``tokens`` and return how many seconds to wait before using them."""
+        wait = self.redis.eval(
+            _RESERVE_SCRIPT, 1, self.key, self.rate, self.capacity, self.clock(), tokens
+        )
+        return float(wait)
+
+    def _record_wait(self, wait: float) -> None:
+        if wait > 0:
+            incr_metric(self.redis, "limiter_waits")
+            incr_metric(self.redis, "limiter_wait_seconds", round(wait, 4))
+
+    def _reserve_and_record(self, tokens: int) -> float:
+        wait = self.reserve(tokens)
+        self._record_wait(wait)
+        return wait
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Block until ``tokens`` may be spent; returns the time waited."""
+        wait = self._reserve_and_record(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: int = 1) -> float:
+        """
+        Asyncio variant of ``acquire``. The Redis round trips run in a
+        thread and the wait is an ``asyncio.sleep``, so the loop never blocks.
+        """
+        wait = await asyncio.to_thread(self._reserve_and_record, tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Fleet-wide circuit breaker for the upstream API.
+
+    ``failure_threshold`` failures within ``window_seconds`` open the
+    breaker for ``cooldown_seconds``; every process then skips upstream
+    calls. After the cool-down one call is let through (half-open), guarded
+    by a ``SET NX`` probe marker so only one process gets it: a success
+    closes the breaker, a failure opens it again. The ``*_async`` methods
+    run the same Redis calls in a thread for the asyncio engine.
+    """
+
+    def __init__(
+        self,
+        redis_conn: Redis,
+        failure_threshold: int,
+        window_seconds: int,
+        cooldown_seconds: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.redis = redis_conn
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+
+    def _open_until(self) -> Optional[float]:
+        value = self.redis.get(BREAKER_OPEN_UNTIL_KEY)
+        return float(value) if value is not None else None
+
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        open_until = self._open_until()
+        if open_until is None:
+            return "closed"
+        return "open" if self.clock() < open_until else "half_open"
+
+    def check(self) -> None:
+        """
+        Raise ``CircuitOpenError`` while the breaker is open, and in
+        half-open for every caller but the one holding the probe.
+        """
+        open_until = self._open_until()
+        if open_until is None:
+            return
+        if self.clock() < open_until:
+            incr_metric(self.redis, "breaker_rejected_calls")
+            raise CircuitOpenError(
+                f"Upstream circuit open for another {open_until - self.clock():.0f}s"
+            )
+        # Half-open: the marker expires on its own if the probe never reports
+        if not self.redis.set(BREAKER_PROBE_KEY, 1, nx=True, ex=self.cooldown_seconds):
+            incr_metric(self.redis, "breaker_rejected_calls")
+            raise CircuitOpenError("Upstream circuit half-open, probe call in flight")
+
+    async def check_async(self) -> None:
+        await asyncio.to_thread(self.check)
+
+    async def record_success_async(self) -> None:
+        await asyncio.to_thread(self.record_success)
+
+    async def record_failure_async(self) -> None:
+        await asyncio.to_thread(self.record_failure)
+
+    def record_success(self) -> None:
+        with self.redis.pipeline() as pipe:
+            pipe.get(BREAKER_OPEN_UNTIL_KEY)
+            pipe.delete(BREAKER_FAILURES_KEY, BREAKER_OPEN_UNTIL_KEY, BREAKER_PROBE_KEY)
+            pipe.hset(METRICS_KEY, "breaker_open", 0)
+            was_open, _, _ = pipe.execute()
+        if was_open is not None:
+            logger.info("Upstream circuit closed")
+
+    def record_failure(self) -> None:
+        half_open = self.state() == "half_open"
+        with self.redis.pipeline() as pipe:
+            pipe.incr(BREAKER_FAILURES_KEY)
+            pipe.expire(BREAKER_FAILURES_KEY, self.window_seconds)
+            failures, _ = pipe.execute()
+        if half_open or failures >= self.failure_threshold:
+            open_until = self.clock() + self.cooldown_seconds
+            # The marker outlives the cool-down so the next call is half-open
+            self.redis.set(
+                BREAKER_OPEN_UNTIL_KEY,
+                open_until,
+                ex=self.cooldown_seconds + self.window_seconds,
+            )
+            self.redis.delete(BREAKER_FAILURES_KEY, BREAKER_PROBE_KEY)
+            incr_metric(self.redis, "breaker_opened")
+            set_metric(self.redis, "breaker_open", 1)
+            logger.warning(
+                "Upstream circuit opened for %ss after %s failures",
+                self.cooldown_seconds,
+                failures,
+            )
+
+
+def get_rate_limiter(redis_conn: Redis) -> Optional[RedisTokenBucket]:
+    """The configured upstream limiter, or None when rate limiting is off."""
+    settings = get_settings()
+    if settings.WEATHER_RATE_LIMIT_PER_SECOND <= 0:
+        return None
+    return RedisTokenBucket(
+        redis_conn,
+        rate=settings.WEATHER_RATE_LIMIT_PER_SECOND,
+        capacity=settings.WEATHER_RATE_LIMIT_BURST,
+    )
+
+
+def get_circuit_breaker(redis_conn: Redis) -> CircuitBreaker:
+    settings = get_settings()
+    return CircuitBreaker(
+        redis_conn,
+        failure_threshold=settings.WEATHER_BREAKER_FAILURE_THRESHOLD,
+        window_seconds=settings.WEATHER_BREAKER_WINDOW_SECONDS,
+        cooldown_seconds=settings.WEATHER_BREAKER_COOLDOWN_SECONDS,
+    )
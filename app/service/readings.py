@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.configuration import get_settings
+from app.models import WeatherReading
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "weather_readings"
+PARTITION_PREFIX = f"{PARENT_TABLE}_p"
+
+# SQLSTATE check_violation, raised for a row no partition accepts
+_NO_PARTITION_SQLSTATE = "23514"
+
+_ROLLUP_HOURLY_SQL = text("""
+INSERT INTO weather_readings_hourly (
+    city, bucket_start,
+    temperature_min, temperature_max, temperature_mean,
+    wind_speed_min, wind_speed_max, wind_speed_mean,
+    sample_count
+)
+SELECT
+    city,
+    date_trunc('hour', observed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+    min(temperature), max(temperature), avg(temperature),
+    min(wind_speed), max(wind_speed), avg(wind_speed),
+    count(*)
+FROM weather_readings
+WHERE observed_at >= :since
+GROUP BY city, bucket
+ON CONFLICT (city, bucket_start) DO UPDATE SET
+    temperature_min = EXCLUDED.temperature_min,
+    temperature_max = EXCLUDED.temperature_max,
+    temperature_mean = EXCLUDED.temperature_mean,
+    wind_speed_min = EXCLUDED.wind_speed_min,
+    wind_speed_max = EXCLUDED.wind_speed_max,
+    wind_speed_mean = EXCLUDED.wind_speed_mean,
+    sample_count = EXCLUDED.sample_count
+""")
+
+# Daily buckets are derived from the hourly table (sample-weighted means),
+# so they never rescan raw partitions.
+_ROLLUP_DAILY_SQL = text("""
+INSERT INTO weather_readings_daily (
+    city, bucket_start,
+    temperature_min, temperature_max, temperature_mean,
+    wind_speed_min, wind_speed_max, wind_speed_mean,
+    sample_count
+)
+SELECT
+    city,
+    date_trunc('day', bucket_start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS bucket,
+    min(temperature_min), max(temperature_max),
+    sum(temperature_mean * sample_count) / sum(sample_count),
+    min(wind_speed_min), max(wind_speed_max),
+    sum(wind_speed_mean * sample_count) / sum(sample_count),
+    sum(sample_count)
+FROM weather_readings_hourly
+WHERE bucket_start >= :since
+GROUP BY city, bucket
+ON CONFLICT (city, bucket_start) DO UPDATE SET
+    temperature_min = EXCLUDED.temperature_min,
+    temperature_max = EXCLUDED.temperature_max,
+    temperature_mean = EXCLUDED.temperature_mean,
+    wind_speed_min = EXCLUDED.wind_speed_min,
+    wind_speed_max = EXCLUDED.wind_speed_max,
+    wind_speed_mean = EXCLUDED.wind_speed_mean,
+    sample_count = EXCLUDED.sample_count
+""")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def ensure_partitions(engine: Engine, days: Iterable[date]) -> None:
+    """
+    Create the daily partitions covering ``days`` if they do not exist yet.
+
+    Runs in its own short transaction so DDL never shares a lock with a
+    job's data transaction. Existing partitions are looked up in the
+    catalog first, so no DDL (and no lock on the parent) is issued for
+    them. Concurrent creators are harmless.
+    """
+    with engine.begin() as conn:
+        existing = set(list_partitions(conn))
+        for day in sorted(set(days)):
+            if partition_name(day) in existing:
+                continue
+            start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(day)} "
+                f"PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') "
+                f"TO ('{(start + timedelta(days=1)).isoformat()}')"
+            ))
+
+
+def _is_missing_partition(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    return (
+        getattr(orig, "pgcode", None) == _NO_PARTITION_SQLSTATE
+        and "no partition of relation" in str(orig)
+    )
+
+
+def _insert_readings(db: Session, readings: List[dict]) -> None:
+    chunk_size = get_settings().DB_UPSERT_CHUNK_SIZE
+    for start in range(0, len(readings), chunk_size):
+        stmt = insert(WeatherReading).values(readings[start:start + chunk_size])
+        db.execute(stmt.on_conflict_do_nothing(index_elements=["city", "observed_at"]))
+
+
+def append_readings(db: Session, rows: List[dict]) -> int:
+    """
+    Bulk-append observations to the history table (no commit).
+
+    Rows carry the ``weather_data`` layout; ``last_updated`` becomes the
+    observation time. Re-fetching an unchanged observation is a no-op.
+
+    Partitions are normally created ahead of time by the maintenance job
+    (``READINGS_PARTITIONS_AHEAD_DAYS``), so the common path issues no DDL.
+    Only when PostgreSQL finds no partition for a row is the insert rolled
+    back to its savepoint, the partitions created, and the insert retried.
+    """
+    if not rows:
+        return 0
+    readings = [
+        {
+            "city": row["city"],
+            "observed_at": row["last_updated"],
+            "latitude": row["latitude"],
+            "longitude": row["longitude"],
+            "temperature": row["temperature"],
+            "wind_speed": row["wind_speed"],
+        }
+        for row in rows
+    ]
+    try:
+        with db.begin_nested():
+            _insert_readings(db, readings)
+    except DBAPIError as exc:
+        if not _is_missing_partition(exc):
+            raise
+        days = {reading["observed_at"].astimezone(timezone.utc).date() for reading in readings}
+        logger.warning("Creating missing readings partitions for %s", sorted(days))
+        ensure_partitions(db.get_bind(), days)
+        with db.begin_nested():
+            _insert_readings(db, readings)
+    return len(readings)
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PARENT_TABLE}).scalars())
+
+
+def drop_expired_partitions(engine: Engine, retention_days: int) -> List[str]:
+    """
+    Drop whole raw partitions older than ``retention_days``.
+
+    Dropping a partition is a metadata operation, so retention costs the
+    same no matter how many rows expire (no row-by-row DELETE, no bloat).
+    """
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=retention_days)
+    dropped: List[str] = []
+    with engine.begin() as conn:
+        for name in list_partitions(conn):
+            if not name.startswith(PARTITION_PREFIX):
+                continue
+            day = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+            if day < cutoff:
+                conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+    return dropped
+
+
+def rollup_readings(db: Session, lookback_hours: int) -> None:
+    """
+    Recompute hourly and daily aggregates touched in the last ``lookback_hours``.
+
+    Buckets are fully recomputed and upserted, so running this repeatedly
+    (or concurrently with appends) converges on the right values.
+    """
+    now = datetime.now(timezone.utc)
+    hourly_since = (now - timedelta(hours=lookback_hours)).replace(minute=0, second=0, microsecond=0)
+    daily_since = hourly_since.replace(hour=0)
+    db.execute(_ROLLUP_HOURLY_SQL, {"since": hourly_since})
+    db.execute(_ROLLUP_DAILY_SQL, {"since": daily_since})
+    db.commit()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from redis import Redis
+
+from app.configuration import get_settings
+from app.service.metrics import incr_metric
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "weather:http"
+MIN_TTL_SECONDS = 30
+
+
+class WeatherResponseCache:
+    """
+    Redis cache of decoded Open-Meteo results shared by every worker.
+
+    Entries are keyed by the requested variables and coordinates rounded to
+    ``precision`` decimals, and expire when the upstream model publishes its
+    next value (observation time + ``WEATHER_REFRESH_SECONDS``).
+    """
+
+    def __init__(
+        self, redis_conn: Redis, variables: List[str], precision: int = 2
+    ) -> None:
+        self.redis = redis_conn
+        self.variables = ",".join(sorted(variables))
+        self.precision = precision
+        self.refresh_seconds = get_settings().WEATHER_REFRESH_SECONDS
+
+    def key(self, latitude: float, longitude: float) -> str:
+        return (
+            f"{CACHE_KEY_PREFIX}:{self.variables}:"
+            f"{latitude:.{self.precision}f}:{longitude:.{self.precision}f}"
+        )
+
+    def get_many(
+        self, cities_config: Dict[str, Dict[str, float]]
+    ) -> Tuple[Dict[str, dict], Dict[str, Dict[str, float]]]:
+        """
+        Split cities into cached results and cities that still need a fetch.
+        A Redis failure turns every city into a miss.
+        """
+        names = list(cities_config.keys())
+        if not names:
+            return {}, {}
+        try:
+            values = self.redis.mget(
+                [
+                    self.key(cities_config[name]["latitude"], cities_config[name]["longitude"])
+                    for name in names
+                ]
+            )
+        except Exception as exc:
+            logger.warning("Response cache unavailable: %s", exc)
+            return {}, dict(cities_config)
+
+        hits: Dict[str, dict] = {}
+        misses: Dict[str, Dict[str, float]] = {}
+        for name, value in zip(names, values):
+            if value is None:
+                misses[name] = cities_config[name]
+                continue
+            result = json.loads(value)
+            result["timestamp"] = datetime.fromisoformat(result["timestamp"])
+            hits[name] = result
+
+        incr_metric(self.redis, "http_cache_hits", len(hits))
+        incr_metric(self.redis, "http_cache_misses", len(misses))
+        return hits, misses
+
+    def set_many(
+        self,
+        cities_config: Dict[str, Dict[str, float]],
+        results: Dict[str, Optional[dict]],
+    ) -> None:
+        """Store successful results until the upstream's next update."""
+        now = time.time()
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                for name, result in results.items():
+                    if not result:
+                        continue
+                    expires_at = result["timestamp"].timestamp() + self.refresh_seconds
+                    ttl = max(MIN_TTL_SECONDS, math.ceil(expires_at - now))
+                    coords = cities_config[name]
+                    pipe.set(
+                        self.key(coords["latitude"], coords["longitude"]),
+                        json.dumps({**result, "timestamp": result["timestamp"].isoformat()}),
+                        ex=ttl,
+                    )
+                pipe.execute()
+        except Exception as exc:
+            logger.warning("Failed to store cached responses: %s", exc)
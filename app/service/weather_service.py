@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Dict, Optional, TypedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict
 
 import openmeteo_requests
+import requests
 import requests_cache
 from retry_requests import retry
 
 from app.configuration import get_settings
+from app.database import get_redis
+from app.service.rate_limiter import get_circuit_breaker, get_rate_limiter
+from app.service.response_cache import WeatherResponseCache
 
 logger = logging.getLogger(__name__)
 
+CURRENT_VARIABLES = ["temperature_2m", "wind_speed_10m"]
+RETRY_BACKOFF_SECONDS = 0.2
+
 
 class WeatherResult(TypedDict):
     temperature: float
@@ -26,10 +34,56 @@ class WeatherService:
 
     def __init__(self) -> None:
         settings = get_settings()
-        cache_session = requests_cache.CachedSession(".cache", expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
+        if settings.WEATHER_CACHE_BACKEND == "sqlite":
+            session = requests_cache.CachedSession(".cache", expire_after=3600)
+        else:
+            session = requests.Session()
+        self.rate_limiter = get_rate_limiter(get_redis())
+        self.circuit_breaker = get_circuit_breaker(get_redis())
+        # With the shared limiter on, every attempt must take its own token,
+        # so retries move out of the transport and into ``fetch_raw``
+        self.http_retries = settings.WEATHER_HTTP_RETRIES if self.rate_limiter else 0
+        retry_session = retry(
+            session,
+            retries=0 if self.rate_limiter else settings.WEATHER_HTTP_RETRIES,
+            backoff_factor=RETRY_BACKOFF_SECONDS,
+        )
         self.client = openmeteo_requests.Client(session=retry_session)
         self.api_url = settings.WEATHER_API_URL
+        self.response_cache: Optional[WeatherResponseCache] = None
+        if settings.WEATHER_CACHE_BACKEND == "redis":
+            self.response_cache = WeatherResponseCache(get_redis(), CURRENT_VARIABLES)
+        self._session = session
+
+    def close(self) -> None:
+        """Release the underlying HTTP connection pool."""
+        self._session.close()
+
+    def fetch_raw(self, params: Dict[str, Any]) -> List[Any]:
+        """
+        Call Open-Meteo behind the fleet-wide rate limiter and circuit breaker
+        and return the decoded per-location responses for any ``params``.
+
+        Transport errors and 5xx responses are retried up to ``http_retries``
+        times, taking a fresh limiter token for each attempt.
+        """
+        self.circuit_breaker.check()
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                responses = self.client.weather_api(self.api_url, params=params)
+                break
+            except Exception as exc:
+                if attempt < self.http_retries and is_retryable_error(exc):
+                    time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                    attempt += 1
+                    continue
+                self.circuit_breaker.record_failure()
+                raise
+        self.circuit_breaker.record_success()
+        return responses
 
     def fetch_current_weather(
         self, latitude: float, longitude: float, city_name: str = "Unknown"
@@ -39,7 +93,7 @@ class WeatherService:
             params = {
                 "latitude": latitude,
                 "longitude": longitude,
-                "current": ["temperature_2m", "wind_speed_10m"],
+                "current": CURRENT_VARIABLES,
             }
 
             logger.info(
@@ -49,26 +103,14 @@ class WeatherService:
                 longitude,
             )
 
-            responses = self.client.weather_api(self.api_url, params=params)
-            response = responses[0]
-            current = response.Current()
-            temperature = round(current.Variables(0).Value(), 2)
-            wind_speed = round(current.Variables(1).Value(), 2)
-            timestamp = datetime.fromtimestamp(current.Time(), tz=timezone.utc)
-
-            result: WeatherResult = {
-                "temperature": temperature,
-                "wind_speed": wind_speed,
-                "timestamp": timestamp,
-                "latitude": response.Latitude(),
-                "longitude": response.Longitude(),
-            }
+            responses = self.fetch_raw(params)
+            result = parse_current_response(responses[0])
 
             logger.info(
                 "Weather for %s => %.2f°C, %.2f km/h",
                 city_name,
-                temperature,
-                wind_speed,
+                result["temperature"],
+                result["wind_speed"],
             )
             return result
 
@@ -76,15 +118,118 @@ class WeatherService:
             logger.error("Failed to fetch %s weather: %s", city_name, exc, exc_info=True)
             return None
 
-    def fetch_multiple_cities(
+    def fetch_city_batch(
         self, cities_config: Dict[str, Dict[str, float]]
     ) -> Dict[str, Optional[WeatherResult]]:
-        """Fetch weather data for multiple cities."""
-        results: Dict[str, Optional[WeatherResult]] = {}
-        for city_name, coords in cities_config.items():
-            results[city_name] = self.fetch_current_weather(
-                latitude=coords["latitude"],
-                longitude=coords["longitude"],
-                city_name=city_name,
+        """
+        Fetch current weather for several cities in a single request.
+
+        Open-Meteo accepts comma-separated coordinate lists and returns one
+        response per location in request order, so ``responses[i]`` belongs
+        to the i-th city. A failed request marks every city in the batch as
+        failed; a malformed entry only fails its own city.
+        """
+        city_names = list(cities_config.keys())
+        results: Dict[str, Optional[WeatherResult]] = dict.fromkeys(city_names)
+        if not city_names:
+            return results
+
+        params = {
+            "latitude": [cities_config[name]["latitude"] for name in city_names],
+            "longitude": [cities_config[name]["longitude"] for name in city_names],
+            "current": CURRENT_VARIABLES,
+        }
+
+        logger.info("Fetching weather batch of %s cities", len(city_names))
+        try:
+            responses = self.fetch_raw(params)
+        except Exception as exc:  # pragma: no cover - network errors
+            logger.error(
+                "Failed to fetch weather batch (%s cities): %s",
+                len(city_names),
+                exc,
+                exc_info=True,
+            )
+            return results
+
+        if len(responses) != len(city_names):
+            logger.error(
+                "Weather batch returned %s responses for %s cities",
+                len(responses),
+                len(city_names),
             )
+            return results
+
+        for city_name, response in zip(city_names, responses):
+            try:
+                results[city_name] = parse_current_response(response)
+            except Exception as exc:  # pragma: no cover - malformed payload
+                logger.error("Failed to decode %s weather: %s", city_name, exc)
+        return results
+
+    def fetch_multiple_cities(
+        self,
+        cities_config: Dict[str, Dict[str, float]],
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Optional[WeatherResult]]:
+        """
+        Fetch weather data for multiple cities.
+
+        Cities are split into chunks of ``batch_size`` (defaults to
+        ``WEATHER_BATCH_SIZE``) and each chunk costs one upstream request.
+        A batch size of 1 falls back to one request per city. With the Redis
+        cache backend, cities with a fresh cached result are not requested.
+        """
+        batch_size = batch_size or get_settings().WEATHER_BATCH_SIZE
+        results: Dict[str, Optional[WeatherResult]] = {}
+        to_fetch = cities_config
+        if self.response_cache is not None:
+            hits, to_fetch = self.response_cache.get_many(cities_config)
+            results.update(hits)
+
+        fetched: Dict[str, Optional[WeatherResult]] = {}
+        if batch_size <= 1:
+            for city_name, coords in to_fetch.items():
+                fetched[city_name] = self.fetch_current_weather(
+                    latitude=coords["latitude"],
+                    longitude=coords["longitude"],
+                    city_name=city_name,
+                )
+        else:
+            for chunk in chunk_cities(to_fetch, batch_size):
+                fetched.update(self.fetch_city_batch(chunk))
+
+        if self.response_cache is not None:
+            self.response_cache.set_many(to_fetch, fetched)
+        results.update(fetched)
         return results
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    """Connection errors, timeouts and 5xx responses; never other 4xx."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return False
+
+
+def chunk_cities(
+    cities_config: Dict[str, Dict[str, float]], chunk_size: int
+) -> Iterator[Dict[str, Dict[str, float]]]:
+    """Yield successive ``chunk_size`` slices of a cities configuration."""
+    items: List[Tuple[str, Dict[str, float]]] = list(cities_config.items())
+    for start in range(0, len(items), chunk_size):
+        yield dict(items[start:start + chunk_size])
+
+
+def parse_current_response(response: Any) -> WeatherResult:
+    """Decode the ``current`` block of a single Open-Meteo location response."""
+    current = response.Current()
+    return {
+        "temperature": round(current.Variables(0).Value(), 2),
+        "wind_speed": round(current.Variables(1).Value(), 2),
+        "timestamp": datetime.fromtimestamp(current.Time(), tz=timezone.utc),
+        "latitude": response.Latitude(),
+        "longitude": response.Longitude(),
+    }
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional, Sequence
+
+import orjson
+from redis import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import WeatherData
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CURRENT_KEY = "weather:snapshot:current"
+SNAPSHOT_SEQUENCE_KEY = "weather:snapshot:seq"
+SNAPSHOT_KEY_PREFIX = "weather:snapshot:v"
+# Safety net only: superseded versions are deleted when the pointer moves,
+# since readers resolve pointer and payload atomically.
+SNAPSHOT_TTL_SECONDS = 24 * 3600
+# Snapshots filled by readers on a miss may race a worker commit, so they
+# expire quickly and self-heal instead of pinning stale data.
+FILL_TTL_SECONDS = 60
+
+# Same fields, in the same order, as ``WeatherDataResponse``
+SNAPSHOT_COLUMNS = (
+    WeatherData.city,
+    WeatherData.latitude,
+    WeatherData.longitude,
+    WeatherData.temperature,
+    WeatherData.wind_speed,
+    WeatherData.id,
+    WeatherData.last_updated,
+)
+_SNAPSHOT_FIELDS = tuple(column.key for column in SNAPSHOT_COLUMNS)
+
+# Move the pointer only forward so a slow writer cannot publish stale data,
+# then delete whichever payload lost (the superseded one or our own).
+# With ARGV[2] == '1' the pointer is only set when no live snapshot is current.
+_PROMOTE_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+local candidate = ARGV[3] .. ARGV[1]
+if existing and ARGV[2] == '1' and redis.call('EXISTS', ARGV[3] .. existing) == 1 then
+    redis.call('DEL', candidate)
+    return 0
+end
+local current = tonumber(existing or '0')
+if tonumber(ARGV[1]) > current then
+    redis.call('SET', KEYS[1], ARGV[1])
+    if existing then
+        redis.call('DEL', ARGV[3] .. existing)
+    end
+    return 1
+end
+redis.call('DEL', candidate)
+return 0
+"""
+
+# Resolve the pointer and read the payload in one round trip.
+_READ_SCRIPT = """
+local version = redis.call('GET', KEYS[1])
+if not version then
+    return false
+end
+return redis.call('GET', ARGV[1] .. version)
+"""
+
+
+def serialize_weather_snapshot(rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    Encode ``SNAPSHOT_COLUMNS`` row tuples as the /api/weather JSON payload.
+
+    Rows go straight to orjson instead of through ORM objects and
+    ``WeatherListResponse``; the output matches that schema, with
+    ``last_sync`` taken from the rows rather than a second query.
+    """
+    data = [dict(zip(_SNAPSHOT_FIELDS, row)) for row in rows]
+    last_sync = max(
+        (item["last_updated"] for item in data if item["last_updated"] is not None),
+        default=None,
+    )
+    return orjson.dumps({"data": data, "last_sync": last_sync}, option=orjson.OPT_UTC_Z)
+
+
+def build_weather_snapshot(db: Session) -> bytes:
+    """Serialize the /api/weather payload from the database."""
+    return serialize_weather_snapshot(db.execute(select(*SNAPSHOT_COLUMNS)).all())
+
+
+async def build_weather_snapshot_async(db: AsyncSession) -> bytes:
+    """Async variant of ``build_weather_snapshot`` for request handlers."""
+    return serialize_weather_snapshot((await db.execute(select(*SNAPSHOT_COLUMNS))).all())
+
+
+def get_weather_snapshot(redis_conn: Redis) -> Optional[bytes]:
+    """Return the current serialized snapshot, or None on a cache miss."""
+    return redis_conn.eval(_READ_SCRIPT, 1, SNAPSHOT_CURRENT_KEY, SNAPSHOT_KEY_PREFIX)
+
+
+def publish_weather_snapshot(
+    redis_conn: Redis, payload: bytes, only_if_missing: bool = False
+) -> Optional[int]:
+    """
+    Store ``payload`` under a fresh versioned key, then promote it.
+
+    The payload key is written completely before the pointer moves, so
+    readers only ever see a whole snapshot; the superseded payload is
+    deleted in the same step, so Redis holds one snapshot at a time.
+    Returns the promoted version, or None when another snapshot won.
+    """
+    ttl = FILL_TTL_SECONDS if only_if_missing else SNAPSHOT_TTL_SECONDS
+    version = redis_conn.incr(SNAPSHOT_SEQUENCE_KEY)
+    redis_conn.set(f"{SNAPSHOT_KEY_PREFIX}{version}", payload, ex=ttl)
+    promoted = redis_conn.eval(
+        _PROMOTE_SCRIPT,
+        1,
+        SNAPSHOT_CURRENT_KEY,
+        version,
+        int(only_if_missing),
+        SNAPSHOT_KEY_PREFIX,
+    )
+    return version if promoted else None
+
+
+def invalidate_weather_snapshot(redis_conn: Redis) -> None:
+    """Drop the pointer so the next reader rebuilds from the database."""
+    redis_conn.delete(SNAPSHOT_CURRENT_KEY)
+
+
+def refresh_weather_snapshot(redis_conn: Redis, db: Session) -> Optional[int]:
+    """
+    Rebuild and publish the snapshot after new data has been committed.
+
+    Cache failures never fail the caller; the snapshot is invalidated
+    instead so readers fall back to the database.
+    """
+    try:
+        return publish_weather_snapshot(redis_conn, build_weather_snapshot(db))
+    except Exception as exc:
+        logger.warning("Failed to refresh weather snapshot: %s", exc)
+        try:
+            invalidate_weather_snapshot(redis_conn)
+        except Exception:
+            pass
+        return None
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from redis import Redis
+from sqlalchemy import Select, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, FLOAT
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.configuration import get_settings
+from app.models import City, WeatherReading
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = "weather:stats:"
+STAT_METRICS = {
+    "temperature": WeatherReading.temperature,
+    "wind_speed": WeatherReading.wind_speed,
+}
+PERCENTILES = (0.5, 0.9, 0.95)
+GroupBy = Literal["city", "region", "all"]
+
+_WINDOW_PATTERN = re.compile(r"^(\d+)([mhd])$")
+_WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+class StatsRequestError(ValueError):
+    """Raised for a stats window or metric the API cannot answer."""
+
+
+def parse_window(window: str) -> timedelta:
+    """``"30m"``, ``"24h"``, ``"7d"`` → timedelta."""
+    match = _WINDOW_PATTERN.match(window)
+    if not match or int(match.group(1)) == 0:
+        raise StatsRequestError(f"Invalid window {window!r}; use e.g. 30m, 24h or 7d")
+    return timedelta(**{_WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def resolve_window(
+    window: str, start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """
+    Concrete ``[start, end)`` boundaries aligned to ``STATS_ALIGN_SECONDS``.
+
+    Open-ended requests ("the last 24h") are floored to the alignment, so
+    every dashboard asking within the same slot shares one cache entry.
+    """
+    settings = get_settings()
+    align = settings.STATS_ALIGN_SECONDS
+    if end is None:
+        now = datetime.now(timezone.utc).timestamp()
+        end = datetime.fromtimestamp(now - now % align, tz=timezone.utc)
+    elif end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is None:
+        start = end - parse_window(window)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    if start >= end:
+        raise StatsRequestError("Window start must be before its end")
+    oldest = datetime.now(timezone.utc) - timedelta(days=settings.READINGS_RETENTION_DAYS)
+    if start < oldest:
+        raise StatsRequestError(
+            f"Window starts before raw readings retention ({settings.READINGS_RETENTION_DAYS} days)"
+        )
+    return start, end
+
+
+def validate_metrics(metrics: Sequence[str]) -> None:
+    unknown = set(metrics) - STAT_METRICS.keys()
+    if unknown or not metrics:
+        raise StatsRequestError(
+            f"Unknown metrics {sorted(unknown)}; choose from {sorted(STAT_METRICS)}"
+        )
+
+
+def build_stats_query(
+    start: datetime,
+    end: datetime,
+    group_by: GroupBy,
+    metrics: Sequence[str],
+    cities: Optional[Sequence[str]] = None,
+) -> Select:
+    """
+    One set-based aggregate over the readings partitions in the window.
+
+    The ``observed_at`` range prunes partitions; percentiles use
+    ``percentile_cont`` so nothing but the aggregates leaves PostgreSQL.
+    """
+    validate_metrics(metrics)
+    if group_by == "city":
+        group_key = WeatherReading.city
+    elif group_by == "region":
+        group_key = func.coalesce(City.region, literal_column("'unassigned'"))
+    else:
+        group_key = literal_column("'all'")
+
+    columns = [group_key.label("group_key"), func.count().label("samples")]
+    percentiles = literal(list(PERCENTILES), type_=ARRAY(FLOAT))
+    for metric in metrics:
+        column = STAT_METRICS[metric]
+        columns += [
+            func.min(column).label(f"{metric}_min"),
+            func.max(column).label(f"{metric}_max"),
+            func.avg(column).label(f"{metric}_mean"),
+            func.percentile_cont(percentiles).within_group(column).label(f"{metric}_pct"),
+        ]
+
+    query = select(*columns).where(
+        WeatherReading.observed_at >= start,
+        WeatherReading.observed_at < end,
+    )
+    if group_by == "region":
+        query = query.join(City, City.name == WeatherReading.city)
+    if cities:
+        query = query.where(WeatherReading.city.in_(list(cities)))
+    if group_by == "all":
+        return query
+    return query.group_by(group_key).order_by(group_key)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
+async def compute_weather_stats(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    group_by: GroupBy,
+    metrics: Sequence[str],
+    cities: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """Run the aggregate and shape plain result rows (no ORM objects) as JSON."""
+    result = await db.execute(build_stats_query(start, end, group_by, metrics, cities))
+    groups: List[Dict[str, Any]] = []
+    for row in result.mappings():
+        if not row["samples"]:
+            continue
+        group: Dict[str, Any] = {"key": row["group_key"], "samples": row["samples"]}
+        for metric in metrics:
+            stats = {
+                "min": _round(row[f"{metric}_min"]),
+                "max": _round(row[f"{metric}_max"]),
+                "mean": _round(row[f"{metric}_mean"]),
+            }
+            for fraction, value in zip(PERCENTILES, row[f"{metric}_pct"] or []):
+                stats[f"p{int(fraction * 100)}"] = _round(value)
+            group[metric] = stats
+        groups.append(group)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "metrics": list(metrics),
+        "groups": groups,
+    }
+
+
+def stats_cache_key(
+    start: datetime,
+    end: datetime,
+    group_by: GroupBy,
+    metrics: Sequence[str],
+    cities: Optional[Sequence[str]],
+) -> str:
+    raw = json.dumps(
+        [start.isoformat(), end.isoformat(), group_by, sorted(metrics), sorted(cities or [])]
+    )
+    return STATS_KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def stats_cache_ttl(end: datetime) -> int:
+    """Windows that closed a while ago no longer change; open ones expire quickly."""
+    settings = get_settings()
+    settle = timedelta(seconds=settings.WEATHER_REFRESH_SECONDS)
+    if end + settle < datetime.now(timezone.utc):
+        return settings.STATS_CLOSED_WINDOW_TTL_SECONDS
+    return settings.STATS_CACHE_TTL_SECONDS
+
+
+def get_cached_stats(redis_conn: Redis, key: str) -> Optional[bytes]:
+    try:
+        return redis_conn.get(key)
+    except Exception as exc:
+        logger.warning("Stats cache unavailable: %s", exc)
+        return None
+
+
+def set_cached_stats(redis_conn: Redis, key: str, payload: bytes, ttl: int) -> None:
+    try:
+        redis_conn.set(key, payload, ex=ttl)
+    except Exception as exc:
+        logger.warning("Failed to cache stats: %s", exc)
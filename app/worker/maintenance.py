@@ -0,0 +1,43 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.configuration import get_settings
+from app.database import SessionLocal, engine
+from app.service.readings import (
+    drop_expired_partitions,
+    ensure_partitions,
+    rollup_readings,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def run_history_maintenance():
+    """
+    Worker task keeping the readings history in shape:
+    create upcoming daily partitions, refresh recent hourly/daily rollups
+    and drop raw partitions past READINGS_RETENTION_DAYS.
+    """
+    settings = get_settings()
+    today = datetime.now(timezone.utc).date()
+    
+    ensure_partitions(
+        engine,
+        [today + timedelta(days=offset)
+         for offset in range(settings.READINGS_PARTITIONS_AHEAD_DAYS + 1)],
+    )
+    
+    db = SessionLocal()
+    try:
+        rollup_readings(db, settings.READINGS_ROLLUP_LOOKBACK_HOURS)
+    except Exception as e:
+        logger.error(f"Readings rollup failed: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    dropped = drop_expired_partitions(engine, settings.READINGS_RETENTION_DAYS)
+    if dropped:
+        logger.info(f"Dropped {len(dropped)} expired readings partitions: {', '.join(dropped)}")
+    return {"dropped_partitions": dropped}
@@ -1,14 +1,38 @@
+import asyncio
 from datetime import datetime, timezone
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, TypedDict
 
 from rq import get_current_job
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.configuration import get_settings
+from app.database import SessionLocal, close_redis_pool, engine, get_redis
 from app.models import JobHistory, JobStatus, WeatherData
-from app.service.weather_service import WeatherResult, WeatherService
+from app.service.async_weather_service import AsyncWeatherService
+from app.service.grid_cells import (
+    learn_grid_cells,
+    plan_grid_fetch,
+    record_dedup_metrics,
+)
+from app.service.forecast_service import fetch_forecast_batch, upsert_forecasts
+from app.service.http_cache import (
+    JOBS_RESOURCE,
+    WEATHER_RESOURCE,
+    bump_resource_version,
+)
+from app.service.job_service import (
+    enqueue_retry_job,
+    mark_run_processing,
+    record_retry_job,
+    release_job_cities,
+    settle_run_status,
+)
+from app.service.live_updates import publish_weather_update
+from app.service.readings import append_readings
+from app.service.weather_snapshot import refresh_weather_snapshot
+from app.service.weather_service import WeatherResult, WeatherService, chunk_cities
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,18 +41,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def fetch_and_store_weather(cities_config: Dict[str, Dict[str, float]]):
+# Process-lifetime clients, reused across jobs in the same process
+_weather_service: Optional[WeatherService] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_service: Optional[AsyncWeatherService] = None
+
+
+class WeatherRow(TypedDict):
+    city: str
+    latitude: float
+    longitude: float
+    temperature: float
+    wind_speed: float
+    last_updated: datetime
+
+
+def fetch_and_store_weather(
+    cities_config: Dict[str, Dict[str, float]],
+    retry_attempt: int = 0,
+):
     """
     Worker task to fetch weather data for multiple cities and store in database.
-    Implements retry logic for failed cities (up to 3 attempts per city).
+    Cities that fail are not retried inline: they are handed to a follow-up
+    job scheduled with exponential backoff (up to JOB_MAX_RETRIES attempts),
+    so this job finishes right away and frees the worker.
     
     Args:
         cities_config: Dictionary with city names as keys and {latitude, longitude} as values
+        retry_attempt: 0 for the original job, N for its N-th delayed retry
     """
     job = get_current_job()
     job_id = job.id if job else "unknown"
+    settings = get_settings()
     
-    logger.info(f"[Job {job_id}] Starting weather fetch for {len(cities_config)} cities")
+    logger.info(f"[Job {job_id}] Starting weather fetch for {len(cities_config)} cities"
+               + (f" (retry {retry_attempt}/{settings.JOB_MAX_RETRIES})" if retry_attempt else ""))
     
     db: Session = SessionLocal()
     job_record = None
@@ -38,76 +85,100 @@ def fetch_and_store_weather(cities_config: Dict[str, Dict[str, float]]):
         job_record = db.query(JobHistory).filter(JobHistory.job_id == job_id).first()
         if job_record:
             job_record.status = JobStatus.PROCESSING
+            if job_record.parent_job_id:
+                mark_run_processing(db, job_record.parent_job_id)
             db.commit()
+            bump_resource_version(get_redis(), JOBS_RESOURCE)
         
-        # Initialize weather service
-        weather_service = WeatherService()
+        # Process-lifetime weather service (blocking client only in sync mode)
+        weather_service = get_weather_service()
         
-        # Track failed cities for retry
+        # Successful rows are written in bulk at the end; failures go to a retry job
         failed_cities = {}
-        successful_count = 0
-        max_retries = 3
-        
-        # First attempt for all cities
-        logger.info(f"[Job {job_id}] First attempt for all cities")
-        for city_name, coords in cities_config.items():
-            weather_data = weather_service.fetch_current_weather(
-                latitude=coords["latitude"],
-                longitude=coords["longitude"],
-                city_name=city_name
-            )
-            
+        weather_rows: Dict[str, WeatherRow] = {}
+        
+        results = fetch_weather(weather_service, cities_config, job_id)
+        for city_name, weather_data in results.items():
+            coords = cities_config[city_name]
             if weather_data:
-                # Upsert weather data
-                upsert_weather_data(db, city_name, coords, weather_data)
-                successful_count += 1
+                weather_rows[city_name] = build_weather_row(city_name, coords, weather_data)
                 logger.info(f"[Job {job_id}] ✓ {city_name} - Success")
             else:
                 failed_cities[city_name] = coords
-                logger.warning(f"[Job {job_id}] ✗ {city_name} - Failed, will retry")
+                logger.warning(f"[Job {job_id}] ✗ {city_name} - Failed")
         
-        # Retry logic for failed cities
-        retry_attempt = 1
-        while failed_cities and retry_attempt <= max_retries:
-            logger.info(f"[Job {job_id}] Retry attempt {retry_attempt}/{max_retries} "
-                       f"for {len(failed_cities)} cities")
-            
-            cities_to_retry = failed_cities.copy()
-            failed_cities.clear()
-            
-            for city_name, coords in cities_to_retry.items():
-                weather_data = weather_service.fetch_current_weather(
-                    latitude=coords["latitude"],
-                    longitude=coords["longitude"],
-                    city_name=city_name
-                )
-                
-                if weather_data:
-                    upsert_weather_data(db, city_name, coords, weather_data)
-                    successful_count += 1
-                    logger.info(f"[Job {job_id}] ✓ {city_name} - Success on retry {retry_attempt}")
-                else:
-                    failed_cities[city_name] = coords
-                    logger.warning(f"[Job {job_id}] ✗ {city_name} - Failed retry {retry_attempt}")
-            
-            retry_attempt += 1
+        retry_id = None
+        run_settled = None
+        if failed_cities and job_record and retry_attempt < settings.JOB_MAX_RETRIES:
+            retry_id = record_retry_job(db, job_record)
+        
+        # Write all rows, the job status and any retry job in a single transaction
+        successful_count = upsert_weather_batch(db, list(weather_rows.values()))
+        append_history(db, job_id, list(weather_rows.values()))
         
-        # Update job status
         if job_record:
             job_record.completed_at = datetime.now(timezone.utc)
+            failed_city_names = ", ".join(failed_cities.keys())
             
-            if failed_cities:
+            if retry_id:
+                job_record.status = JobStatus.RETRYING
+                job_record.error_message = (f"Retrying {len(failed_cities)} cities as job "
+                                            f"{retry_id}: {failed_city_names}")[:500]
+                logger.warning(f"[Job {job_id}] {len(failed_cities)} cities deferred to "
+                               f"retry job {retry_id}. Success: {successful_count}/{len(cities_config)}")
+            elif failed_cities:
                 job_record.status = JobStatus.FAILED
-                failed_city_names = ", ".join(failed_cities.keys())
-                job_record.error_message = f"Failed to fetch data for: {failed_city_names}"
+                job_record.error_message = f"Failed to fetch data for: {failed_city_names}"[:500]
                 logger.error(f"[Job {job_id}] Completed with failures. "
                            f"Success: {successful_count}/{len(cities_config)}")
             else:
                 job_record.status = JobStatus.COMPLETED
                 logger.info(f"[Job {job_id}] Completed successfully. "
                           f"All {successful_count} cities updated")
-            
-            db.commit()
+        
+        db.commit()
+        if job_record:
+            bump_resource_version(get_redis(), JOBS_RESOURCE)
+        
+        if retry_id:
+            try:
+                delay = enqueue_retry_job(retry_id, failed_cities, retry_attempt + 1)
+                logger.info(f"[Job {job_id}] Retry job {retry_id} scheduled in {delay:.1f}s")
+            except Exception as e:
+                logger.error(f"[Job {job_id}] Could not schedule retry job: {str(e)}")
+                db.query(JobHistory).filter(JobHistory.job_id == retry_id).update(
+                    {
+                        JobHistory.status: JobStatus.FAILED,
+                        JobHistory.completed_at: datetime.now(timezone.utc),
+                        JobHistory.error_message: f"Retry enqueue failed: {str(e)}"[:500],
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+                bump_resource_version(get_redis(), JOBS_RESOURCE)
+                run_settled = settle_run_status(db, job_record.parent_job_id or job_record.job_id)
+                retry_id = None
+        
+        # Push the delta to live clients now that the new rows are visible
+        if successful_count:
+            try:
+                publish_weather_update(get_redis(), weather_rows.values())
+            except Exception as e:
+                logger.warning(f"[Job {job_id}] Could not publish live update: {str(e)}")
+        
+        # Let later requests enqueue these cities again (a retry job keeps its cities)
+        if job_record:
+            released = weather_rows.keys() if retry_id else cities_config.keys()
+            release_job_cities(get_redis(), job_record, list(released))
+        
+        # Fan-in: the last shard of a run settles the run status
+        if job_record and job_record.parent_job_id:
+            run_settled = settle_run_status(db, job_record.parent_job_id) or run_settled
+        
+        # The full API snapshot is rebuilt once per run: by a standalone job
+        # itself, or by whichever shard/retry job settled the run
+        if run_settled or (successful_count and not (job_record and job_record.parent_job_id)):
+            republish_weather_snapshot(db)
         
         logger.info(f"[Job {job_id}] Job finished. Success: {successful_count}, "
                    f"Failed: {len(failed_cities)}")
@@ -115,12 +186,18 @@ def fetch_and_store_weather(cities_config: Dict[str, Dict[str, float]]):
     except Exception as e:
         logger.error(f"[Job {job_id}] Critical error: {str(e)}", exc_info=True)
         
-        # Update job status to failed
+        # Discard the partial transaction, then mark the job as failed
+        db.rollback()
         if job_record:
             job_record.status = JobStatus.FAILED
             job_record.completed_at = datetime.now(timezone.utc)
             job_record.error_message = str(e)[:500]
             db.commit()
+            bump_resource_version(get_redis(), JOBS_RESOURCE)
+            release_job_cities(get_redis(), job_record, list(cities_config.keys()))
+            if job_record.parent_job_id and settle_run_status(db, job_record.parent_job_id):
+                # Other shards of the run may have written rows
+                republish_weather_snapshot(db)
         
         raise
     
@@ -128,6 +205,143 @@ def fetch_and_store_weather(cities_config: Dict[str, Dict[str, float]]):
         db.close()
 
 
+def republish_weather_snapshot(db: Session) -> None:
+    """Rebuild the /api/weather snapshot and move its HTTP validators."""
+    refresh_weather_snapshot(get_redis(), db)
+    bump_resource_version(get_redis(), WEATHER_RESOURCE)
+
+
+def fetch_weather(
+    weather_service: Optional[WeatherService],
+    cities_config: Dict[str, Dict[str, float]],
+    job_id: str = "unknown",
+) -> Dict[str, Optional[WeatherResult]]:
+    """
+    Fetch weather for a set of cities with the configured engine.
+
+    Without a blocking ``WeatherService`` all cities are fetched concurrently
+    on the asyncio engine, so the call takes as long as the slowest request.
+    With ``WEATHER_GRID_DEDUP`` each known model grid cell is fetched once
+    and its result is shared by every city inside it.
+    """
+    if not get_settings().WEATHER_GRID_DEDUP:
+        return _fetch_with_engine(weather_service, cities_config)
+
+    redis_conn = get_redis()
+    plan = plan_grid_fetch(redis_conn, cities_config)
+    results = plan.fan_out(_fetch_with_engine(weather_service, plan.requests))
+
+    # Learn the cell of every city that was fetched on its own
+    new_cities = {
+        city_name: results[city_name]
+        for key, members in plan.members.items()
+        if key.startswith("city:")
+        for city_name in members
+    }
+    learn_grid_cells(redis_conn, cities_config, new_cities)
+    record_dedup_metrics(redis_conn, plan)
+    logger.info(f"[Job {job_id}] Grid dedup: {plan.city_count} cities -> "
+               f"{len(plan.requests)} upstream locations "
+               f"(ratio {plan.dedup_ratio:.2f})")
+    return results
+
+
+def _fetch_with_engine(
+    weather_service: Optional[WeatherService],
+    cities_config: Dict[str, Dict[str, float]],
+) -> Dict[str, Optional[WeatherResult]]:
+    if weather_service is None:
+        return _fetch_async(cities_config)
+    return weather_service.fetch_multiple_cities(cities_config)
+
+
+def get_weather_service() -> Optional[WeatherService]:
+    """
+    Return the process-lifetime blocking client, or None in async mode.
+
+    A forking worker builds it once per work-horse; the warm worker keeps
+    it (and its HTTP pool) across jobs until the process state is recycled.
+    """
+    if get_settings().WEATHER_FETCH_MODE != "sync":
+        return None
+    return _blocking_weather_service()
+
+
+def _blocking_weather_service() -> WeatherService:
+    global _weather_service
+    if _weather_service is None:
+        _weather_service = WeatherService()
+    return _weather_service
+
+
+def fetch_and_store_forecasts(cities_config: Dict[str, Dict[str, float]]):
+    """
+    Worker task to ingest hourly forecasts for a shard of cities.
+    Each chunk of WEATHER_BATCH_SIZE cities is one upstream request,
+    decoded as NumPy arrays and stored as one compact row per city.
+    A failed chunk is logged and skipped; the next refresh retries it.
+    """
+    job = get_current_job()
+    job_id = job.id if job else "unknown"
+    settings = get_settings()
+    weather_service = _blocking_weather_service()
+    
+    logger.info(f"[Job {job_id}] Starting forecast fetch for {len(cities_config)} cities")
+    
+    rows = []
+    failed = 0
+    for chunk in chunk_cities(cities_config, settings.WEATHER_BATCH_SIZE):
+        try:
+            rows.extend(fetch_forecast_batch(weather_service, chunk))
+        except Exception as e:
+            failed += len(chunk)
+            logger.error(f"[Job {job_id}] Forecast batch of {len(chunk)} cities failed: {str(e)}")
+    
+    db: Session = SessionLocal()
+    try:
+        stored = upsert_forecasts(db, rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[Job {job_id}] Failed to store forecasts: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+    
+    logger.info(f"[Job {job_id}] Forecasts stored: {stored}, failed: {failed}")
+    return {"stored": stored, "failed": failed}
+
+
+def _fetch_async(
+    cities_config: Dict[str, Dict[str, float]],
+) -> Dict[str, Optional[WeatherResult]]:
+    """Run the async engine on a process-lifetime event loop and pool."""
+    global _async_loop, _async_service
+    if _async_loop is None or _async_loop.is_closed():
+        _async_loop = asyncio.new_event_loop()
+    if _async_service is None:
+        _async_service = AsyncWeatherService()
+    return _async_loop.run_until_complete(
+        _async_service.fetch_multiple_cities(cities_config)
+    )
+
+
+def reset_worker_state() -> None:
+    """Drop every warm client and pooled connection held by this process."""
+    global _weather_service, _async_loop, _async_service
+    if _async_service is not None and _async_loop is not None:
+        _async_loop.run_until_complete(_async_service.aclose())
+    if _async_loop is not None:
+        _async_loop.close()
+    if _weather_service is not None:
+        _weather_service.close()
+    _weather_service = None
+    _async_service = None
+    _async_loop = None
+    engine.dispose()
+    close_redis_pool()
+
+
 def upsert_weather_data(
     db: Session,
     city_name: str,
@@ -156,6 +370,8 @@ def upsert_weather_data(
     stmt = stmt.on_conflict_do_update(
         index_elements=['city'],
         set_={
+            'latitude': stmt.excluded.latitude,
+            'longitude': stmt.excluded.longitude,
             'temperature': stmt.excluded.temperature,
             'wind_speed': stmt.excluded.wind_speed,
             'last_updated': stmt.excluded.last_updated
@@ -163,4 +379,67 @@ def upsert_weather_data(
     )
     
     db.execute(stmt)
-    db.commit()
\ No newline at end of file
+    db.commit()
+
+
+def build_weather_row(
+    city_name: str,
+    coords: Dict[str, float],
+    weather_data: WeatherResult,
+) -> WeatherRow:
+    """Map a fetched result onto the ``weather_data`` column layout."""
+    return {
+        "city": city_name,
+        "latitude": coords["latitude"],
+        "longitude": coords["longitude"],
+        "temperature": weather_data["temperature"],
+        "wind_speed": weather_data["wind_speed"],
+        "last_updated": weather_data["timestamp"],
+    }
+
+
+def upsert_weather_batch(db: Session, rows: List[WeatherRow]) -> int:
+    """
+    Upsert many cities with multi-row ``INSERT ... ON CONFLICT DO UPDATE``.
+
+    Rows are sent in chunks of ``DB_UPSERT_CHUNK_SIZE`` to stay under the
+    driver's bind-parameter limit. The caller owns the transaction: nothing
+    is committed here, so the rows and the job status land atomically.
+    
+    Args:
+        db: Database session
+        rows: Weather rows, at most one per city
+    
+    Returns:
+        Number of rows written
+    """
+    chunk_size = get_settings().DB_UPSERT_CHUNK_SIZE
+    for start in range(0, len(rows), chunk_size):
+        stmt = insert(WeatherData).values(rows[start:start + chunk_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['city'],
+            set_={
+                'latitude': stmt.excluded.latitude,
+                'longitude': stmt.excluded.longitude,
+                'temperature': stmt.excluded.temperature,
+                'wind_speed': stmt.excluded.wind_speed,
+                'last_updated': stmt.excluded.last_updated
+            }
+        )
+        db.execute(stmt)
+    return len(rows)
+
+
+def append_history(db: Session, job_id: str, rows: List[WeatherRow]) -> None:
+    """
+    Append the job's observations to ``weather_readings`` in the job's
+    transaction. A savepoint keeps a history failure (e.g. a missing
+    partition) from losing the current-data upsert.
+    """
+    if not rows:
+        return
+    try:
+        with db.begin_nested():
+            append_readings(db, rows)
+    except Exception as e:
+        logger.error(f"[Job {job_id}] Could not append readings history: {str(e)}")
@@ -1,9 +1,11 @@
 import logging
 
 from redis import Redis
-from rq import Connection, Worker
+from rq import Connection, SimpleWorker, Worker
 
 from app.configuration import get_settings
+from app.service.job_service import QUEUE_NAME
+from app.worker.rq_worker import reset_worker_state
 
 
 logging.basicConfig(
@@ -15,20 +17,67 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-QUEUE_NAME = "weather-jobs"
+class RecyclingWorker(SimpleWorker):
+    """
+    SimpleWorker that counts the jobs it ran in this process.
+
+    RQ's ``successful_job_count``/``failed_job_count`` only change in Redis
+    (they are read back by ``refresh()``), so they cannot tell a recycle
+    from a signal stop after ``work()`` returns.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jobs_executed = 0
+
+    def execute_job(self, job, queue):
+        try:
+            return super().execute_job(job, queue)
+        finally:
+            self.jobs_executed += 1
+
+
+def run_warm_worker(redis_conn: Redis):
+    """
+    Run jobs in this process instead of forking a work-horse per job.
+
+    The weather service, HTTP pool and DB pool stay warm across jobs. After
+    WORKER_RECYCLE_AFTER_JOBS jobs the warm state is torn down and rebuilt,
+    bounding any leak or stale connection.
+    """
+    recycle_after = settings.WORKER_RECYCLE_AFTER_JOBS
+    while True:
+        worker = RecyclingWorker([QUEUE_NAME], connection=redis_conn)
+        logger.info(
+            "Warm worker listening on queue '%s' (recycle after %s jobs)...",
+            QUEUE_NAME,
+            recycle_after,
+        )
+        worker.work(with_scheduler=True, max_jobs=recycle_after)
+        
+        reset_worker_state()
+        if worker._stop_requested or worker.jobs_executed < recycle_after:
+            # Stopped by a signal (or an error) rather than the recycle limit
+            break
+        logger.info("Recycling warm worker state after %s jobs", worker.jobs_executed)
+
 
 def main():
     """Run RQ worker"""
-    logger.info("Starting RQ Worker...")
+    logger.info("Starting RQ Worker (%s mode)...", settings.WORKER_MODE)
     logger.info(f"Connecting to Redis: {settings.REDIS_URL.split('@')[-1]}")
     
     redis_conn = Redis.from_url(settings.REDIS_URL)
 
     with Connection(redis_conn):
+        if settings.WORKER_MODE == "warm":
+            run_warm_worker(redis_conn)
+            return
         worker = Worker([QUEUE_NAME], connection=redis_conn)
         logger.info("Worker listening on queue '%s'...", QUEUE_NAME)
-        worker.work(with_scheduler=False)
+        # The scheduler promotes delayed retry jobs once they are due
+        worker.work(with_scheduler=True)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
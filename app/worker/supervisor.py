@@ -0,0 +1,164 @@
+import logging
+import math
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from rq import Queue
+from rq.job import Job
+
+from app.configuration import get_settings
+from app.database import close_redis_pool, get_redis
+from app.service.job_service import get_queue
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+WORKER_COMMAND = [sys.executable, "-m", "app.worker.run_worker"]
+
+
+def oldest_job_age(queue: Queue) -> float:
+    """Seconds the job at the head of the queue has been waiting (0 if empty)."""
+    job_ids = queue.get_job_ids(0, 1)
+    if not job_ids:
+        return 0.0
+    job = Job.fetch(job_ids[0], connection=queue.connection)
+    if job.enqueued_at is None:
+        return 0.0
+    enqueued_at = job.enqueued_at
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (datetime.now(timezone.utc) - enqueued_at).total_seconds())
+
+
+class WorkerSupervisor:
+    """
+    Keep between SUPERVISOR_MIN_WORKERS and SUPERVISOR_MAX_WORKERS worker
+    processes running, sized by queue depth and the age of the oldest job.
+
+    Growth is immediate; shrinking drains one worker at a time once demand
+    has stayed low for SUPERVISOR_SCALE_DOWN_DELAY_SECONDS. A drained worker
+    receives SIGTERM, which RQ treats as a warm shutdown: it finishes the
+    current job and exits.
+    """
+
+    def __init__(self, queue: Queue) -> None:
+        self.queue = queue
+        self.min_workers = settings.SUPERVISOR_MIN_WORKERS
+        self.max_workers = max(settings.SUPERVISOR_MAX_WORKERS, self.min_workers)
+        self.workers: List[subprocess.Popen] = []
+        self.draining: List[subprocess.Popen] = []
+        self._low_demand_since: Optional[float] = None
+        self._stopping = False
+
+    def desired_size(self, depth: int, age: float) -> int:
+        """Target pool size for the current backlog."""
+        target = math.ceil(depth / settings.SUPERVISOR_JOBS_PER_WORKER)
+        if age >= settings.SUPERVISOR_MAX_JOB_AGE_SECONDS:
+            # Jobs are waiting too long: grow past the depth-based target
+            target = max(target, len(self.workers) + 1)
+        return min(self.max_workers, max(self.min_workers, target))
+
+    def spawn(self) -> None:
+        # Own session: a terminal Ctrl-C reaches only the supervisor, which
+        # then drains each worker with a single SIGTERM (RQ warm shutdown)
+        process = subprocess.Popen(WORKER_COMMAND, start_new_session=True)
+        self.workers.append(process)
+        logger.info("Started worker pid=%s (%s running)", process.pid, len(self.workers))
+
+    def drain_one(self) -> None:
+        process = self.workers.pop()
+        process.send_signal(signal.SIGTERM)
+        self.draining.append(process)
+        logger.info("Draining worker pid=%s (%s running)", process.pid, len(self.workers))
+
+    def reap(self) -> None:
+        """Forget exited processes; crashed workers are replaced by ``scale``."""
+        for process in [p for p in self.workers if p.poll() is not None]:
+            logger.warning("Worker pid=%s exited with %s", process.pid, process.returncode)
+            self.workers.remove(process)
+        self.draining = [p for p in self.draining if p.poll() is None]
+
+    def scale(self) -> None:
+        depth = self.queue.count
+        age = oldest_job_age(self.queue) if depth else 0.0
+        target = self.desired_size(depth, age)
+        current = len(self.workers)
+
+        if target > current:
+            logger.info(
+                "Scaling up %s -> %s (depth=%s, oldest=%.0fs)", current, target, depth, age
+            )
+            for _ in range(target - current):
+                self.spawn()
+            self._low_demand_since = None
+        elif target < current:
+            now = time.monotonic()
+            if self._low_demand_since is None:
+                self._low_demand_since = now
+            elif now - self._low_demand_since >= settings.SUPERVISOR_SCALE_DOWN_DELAY_SECONDS:
+                self.drain_one()
+                self._low_demand_since = now
+        else:
+            self._low_demand_since = None
+
+    def stop(self, *_args) -> None:
+        self._stopping = True
+
+    def shutdown(self) -> None:
+        """Drain every worker, then force-kill whatever outlives the grace period."""
+        while self.workers:
+            self.drain_one()
+        deadline = time.monotonic() + settings.SUPERVISOR_SHUTDOWN_GRACE_SECONDS
+        for process in self.draining:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning("Killing worker pid=%s after grace period", process.pid)
+                process.kill()
+                process.wait()
+        self.draining = []
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        try:
+            while not self._stopping:
+                self.reap()
+                try:
+                    self.scale()
+                except Exception as e:
+                    logger.error(f"Autoscaling check failed: {str(e)}")
+                    while len(self.workers) < self.min_workers:
+                        self.spawn()
+                time.sleep(settings.SUPERVISOR_POLL_SECONDS)
+        finally:
+            self.shutdown()
+
+
+def main():
+    """Run an autoscaling pool of RQ workers on this host."""
+    logger.info(
+        "Starting worker supervisor (min=%s, max=%s)...",
+        settings.SUPERVISOR_MIN_WORKERS,
+        settings.SUPERVISOR_MAX_WORKERS,
+    )
+    supervisor = WorkerSupervisor(get_queue(get_redis()))
+    try:
+        supervisor.run()
+    finally:
+        close_redis_pool()
+        logger.info("Supervisor shut down")
+
+
+if __name__ == '__main__':
+    main()
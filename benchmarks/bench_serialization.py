@@ -0,0 +1,93 @@
+"""
+Response serialization cost: Pydantic models versus plain rows + orjson.
+
+Builds synthetic weather and job-history rows and times both encodings of
+the /api/weather and /api/jobs payloads. No database or Redis is needed.
+
+    pydantic: ORM-like objects -> model_validate -> model_dump_json
+    orjson:   row tuples -> dicts -> orjson.dumps (the API's path)
+
+Usage:
+    python -m benchmarks.bench_serialization [--sizes 10 1000 100000] [--repeat 5]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.models import JobStatus, JobTrigger
+from app.schema import JobHistoryResponse, WeatherDataResponse, WeatherListResponse
+from app.service.job_history import JOB_HISTORY_COLUMNS, serialize_job_page
+from app.service.weather_snapshot import SNAPSHOT_COLUMNS, serialize_weather_snapshot
+
+NOW = datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+
+def weather_rows(count: int):
+    return [
+        (f"City {i}", 51.5 + i * 1e-4, -0.12 - i * 1e-4, 12.34, 7.5, i, NOW - timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def job_rows(count: int):
+    return [
+        (
+            i, f"job-{i}", JobStatus.COMPLETED, JobTrigger.SCHEDULED,
+            NOW - timedelta(seconds=i), NOW, None, None, 0, None,
+        )
+        for i in range(count)
+    ]
+
+
+def as_objects(rows, columns):
+    names = [column.key for column in columns]
+    return [SimpleNamespace(**dict(zip(names, row))) for row in rows]
+
+
+def pydantic_weather(records) -> bytes:
+    return WeatherListResponse(
+        data=[WeatherDataResponse.model_validate(record) for record in records],
+        last_sync=max(record.last_updated for record in records),
+    ).model_dump_json().encode()
+
+
+def pydantic_jobs(records) -> bytes:
+    return b"[" + b",".join(
+        JobHistoryResponse.model_validate(record).model_dump_json().encode()
+        for record in records
+    ) + b"]"
+
+
+def best_of(func, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'payload':<10}{'rows':>8}{'pydantic ms':>14}{'orjson ms':>12}{'speedup':>9}")
+    for size in args.sizes:
+        cases = [
+            ("weather", weather_rows(size), SNAPSHOT_COLUMNS, pydantic_weather, serialize_weather_snapshot),
+            ("jobs", job_rows(size), JOB_HISTORY_COLUMNS, pydantic_jobs, serialize_job_page),
+        ]
+        for name, rows, columns, slow, fast in cases:
+            slow_time = best_of(slow, as_objects(rows, columns), args.repeat)
+            fast_time = best_of(fast, rows, args.repeat)
+            print(
+                f"{name:<10}{size:>8}{slow_time * 1000:>14.3f}{fast_time * 1000:>12.3f}"
+                f"{slow_time / fast_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
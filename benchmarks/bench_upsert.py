@@ -0,0 +1,97 @@
+"""
+Compare rows/sec of the per-row upsert path against the bulk upsert path.
+
+Runs against the database in DATABASE_URL using synthetic ``bench-*`` cities,
+which are deleted afterwards.
+
+Usage:
+    python -m benchmarks.bench_upsert --rows 5000
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+from app.database import SessionLocal
+from app.models import WeatherData
+from app.worker.rq_worker import (
+    build_weather_row,
+    upsert_weather_batch,
+    upsert_weather_data,
+)
+
+CITY_PREFIX = "bench-"
+
+
+def make_rows(count: int):
+    now = datetime.now(timezone.utc)
+    rows = []
+    for index in range(count):
+        coords = {"latitude": (index % 180) - 90.0, "longitude": (index % 360) - 180.0}
+        result = {
+            "temperature": 20.0 + index % 10,
+            "wind_speed": 5.0 + index % 7,
+            "timestamp": now,
+            "latitude": coords["latitude"],
+            "longitude": coords["longitude"],
+        }
+        rows.append((f"{CITY_PREFIX}{index}", coords, result))
+    return rows
+
+
+def bench_per_row(rows) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for city_name, coords, result in rows:
+            upsert_weather_data(db, city_name, coords, result)
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def bench_bulk(rows) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        upsert_weather_batch(
+            db, [build_weather_row(city, coords, result) for city, coords, result in rows]
+        )
+        db.commit()
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    db = SessionLocal()
+    try:
+        db.query(WeatherData).filter(WeatherData.city.like(f"{CITY_PREFIX}%")).delete(
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    try:
+        # Each path runs twice: insert into an empty range, then update existing rows.
+        for label, bench in (("per-row", bench_per_row), ("bulk", bench_bulk)):
+            cleanup()
+            insert_elapsed = bench(rows)
+            update_elapsed = bench(rows)
+            print(
+                f"{label:>8}: insert {args.rows / insert_elapsed:10.0f} rows/s, "
+                f"update {args.rows / update_elapsed:10.0f} rows/s"
+            )
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
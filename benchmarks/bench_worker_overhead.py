@@ -0,0 +1,72 @@
+"""
+Per-job setup overhead of the forking worker versus the warm worker.
+
+For each mode, runs a no-op "job" that does the setup a real job performs
+(weather service, DB session with one round trip) and reports the mean
+wall time per job. No upstream weather requests are made.
+
+    fork: os.fork() per job, fresh WeatherService and DB connection in the child
+    warm: one process, WeatherService and DB pool reused across jobs
+
+Usage:
+    python -m benchmarks.bench_worker_overhead --jobs 50 [--no-db]
+"""
+import argparse
+import os
+import time
+
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.service.weather_service import WeatherService
+
+
+def job_setup(weather_service, use_db: bool) -> None:
+    if weather_service is None:
+        weather_service = WeatherService()
+    if use_db:
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
+
+
+def bench_fork(jobs: int, use_db: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(jobs):
+        pid = os.fork()
+        if pid == 0:
+            # Like an RQ work-horse: never reuse the parent's pooled connections
+            engine.dispose(close=False)
+            job_setup(None, use_db)
+            os._exit(0)
+        os.waitpid(pid, 0)
+    return (time.perf_counter() - started) / jobs
+
+
+def bench_warm(jobs: int, use_db: bool) -> float:
+    weather_service = WeatherService()
+    job_setup(weather_service, use_db)  # warm-up, like the first job after start
+    started = time.perf_counter()
+    for _ in range(jobs):
+        job_setup(weather_service, use_db)
+    return (time.perf_counter() - started) / jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--no-db", action="store_true", help="Skip the database round trip")
+    args = parser.parse_args()
+    use_db = not args.no_db
+
+    fork_ms = bench_fork(args.jobs, use_db) * 1000
+    warm_ms = bench_warm(args.jobs, use_db) * 1000
+    print(f"fork: {fork_ms:8.2f} ms/job")
+    print(f"warm: {warm_ms:8.2f} ms/job")
+    print(f"saved per job: {fork_ms - warm_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Concurrent load test for the read endpoints of a running API.
+
+Reports throughput and p50/p95/p99 latency per endpoint. Run it once
+against the baseline build and once against the current build to compare
+how latency holds up under concurrent clients.
+
+Usage:
+    python -m benchmarks.load_test_api --base-url http://localhost:8000 \\
+        --clients 100 --requests 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = ["/api/weather", "/api/jobs", "/", "/weather"]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_client(
+    client: httpx.AsyncClient, path: str, count: int, latencies: List[float], errors: List[int]
+) -> None:
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+        latencies.append(time.perf_counter() - started)
+
+
+async def load_endpoint(base_url: str, path: str, clients: int, requests: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[int] = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(run_client(client, path, requests, latencies, errors) for _ in range(clients))
+        )
+        elapsed = time.perf_counter() - started
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "errors": len(errors),
+    }
+
+
+async def main_async(args) -> None:
+    print(f"{'endpoint':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for path in args.paths:
+        stats = await load_endpoint(args.base_url, path, args.clients, args.requests)
+        print(
+            f"{path:<14}{stats['rps']:>10.0f}{stats['p50']:>10.1f}"
+            f"{stats['p95']:>10.1f}{stats['p99']:>10.1f}{stats['errors']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per client")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
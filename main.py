@@ -6,8 +6,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.configuration import get_settings
+from app.database import async_engine, close_redis_pool, init_redis_pool
+from app.routes.city_routes import router as city_router
 from app.routes.page_routes import router as page_router
 from app.routes.weather_routes import router as api_router
+from app.service.city_registry import get_city_index_sync
+from app.service.live_updates import get_broadcaster
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +52,7 @@ if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 app.include_router(page_router)
 app.include_router(api_router, prefix="/api")
+app.include_router(city_router, prefix="/api")
 
 
 @app.on_event("startup")
@@ -58,11 +63,18 @@ async def startup_event():
     logger.info("Starting Weather API service...")
     logger.info("Database: %s", db_target)
     logger.info("Redis: %s", redis_target)
+    init_redis_pool()
+    await get_broadcaster().start()
+    await get_city_index_sync().start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Weather API service...")
+    await get_broadcaster().stop()
+    await get_city_index_sync().stop()
+    close_redis_pool()
+    await async_engine.dispose()
 
 
 if __name__ == "__main__":
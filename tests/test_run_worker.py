@@ -0,0 +1,54 @@
+from redis import Redis
+
+from app.worker import run_worker
+from app.worker.run_worker import RecyclingWorker, run_warm_worker
+
+
+def _offline_init(self, *args, **kwargs):
+    # RQ's constructor talks to Redis; the loop only needs the stop flag
+    self._stop_requested = False
+
+
+def test_warm_worker_recycles_until_stopped(monkeypatch):
+    """Two full cycles recycle the warm state; a short cycle ends the loop."""
+    jobs_per_cycle = iter([3, 3, 1])
+    cycles = []
+    resets = []
+
+    def fake_work(self, with_scheduler=False, max_jobs=None):
+        for _ in range(min(next(jobs_per_cycle), max_jobs)):
+            self.execute_job(None, None)
+        cycles.append(self.jobs_executed)
+        return bool(self.jobs_executed)
+
+    monkeypatch.setattr(run_worker.settings, "WORKER_RECYCLE_AFTER_JOBS", 3)
+    monkeypatch.setattr(run_worker.SimpleWorker, "__init__", _offline_init)
+    monkeypatch.setattr(run_worker.SimpleWorker, "execute_job", lambda self, job, queue: None)
+    monkeypatch.setattr(RecyclingWorker, "work", fake_work)
+    monkeypatch.setattr(run_worker, "reset_worker_state", lambda: resets.append(True))
+
+    run_warm_worker(Redis.from_url("redis://localhost:6379/0"))
+
+    assert cycles == [3, 3, 1]
+    assert len(resets) == 3
+
+
+def test_warm_worker_stops_on_signal_after_full_cycle(monkeypatch):
+    """A stop requested during the last job of a cycle is not a recycle."""
+    cycles = []
+
+    def fake_work(self, with_scheduler=False, max_jobs=None):
+        for _ in range(max_jobs):
+            self.execute_job(None, None)
+        self._stop_requested = True
+        cycles.append(self.jobs_executed)
+
+    monkeypatch.setattr(run_worker.settings, "WORKER_RECYCLE_AFTER_JOBS", 2)
+    monkeypatch.setattr(run_worker.SimpleWorker, "__init__", _offline_init)
+    monkeypatch.setattr(run_worker.SimpleWorker, "execute_job", lambda self, job, queue: None)
+    monkeypatch.setattr(RecyclingWorker, "work", fake_work)
+    monkeypatch.setattr(run_worker, "reset_worker_state", lambda: None)
+
+    run_warm_worker(Redis.from_url("redis://localhost:6379/0"))
+
+    assert cycles == [2]